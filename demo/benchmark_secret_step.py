@@ -0,0 +1,14 @@
+import sys
+import os
+
+# Add root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from rl.environments.secret_env import benchmark_step
+
+if __name__ == "__main__":
+    n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for env_id in [0, 1, 2, 3]:
+        r = benchmark_step(env_id, n_steps)
+        print(f"Secret Env {env_id}: legacy {r['legacy']:,.0f} steps/s, "
+              f"fused {r['fused']:,.0f} steps/s ({r['speedup']:.2f}x)")
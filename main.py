@@ -26,6 +26,7 @@ from rl.algorithms.planning.dyna_q_plus import DynaQPlus
 
 from tqdm import tqdm
 from rl.experiments.run_experiment import run_experiment
+from rl.experiments.parallel_runner import make_job, run_grid
 
 def train_all_on_env(env, env_name, episodes_td=5000, episodes_mc=10000):
     print(f"\n{'='*20} Training on {env_name} {'='*20}")
@@ -97,5 +98,46 @@ def main():
 
     print("\n✅ All trainings completed!")
 
+def build_jobs(episodes_td=1000, episodes_mc=2000):
+    """The same experiments as main(), as jobs for the parallel runner"""
+    envs = [
+        (LineWorld, {}, "line_world"),
+        (GridWorld, {"size": 5}, "grid_world"),
+        (RockPaperScissors, {}, "rps"),
+        (MontyHallLvl1, {}, "monty_hall_l1"),
+        (MontyHallLvl2, {}, "monty_hall_l2")
+    ]
+    jobs = []
+    for env_cls, env_kwargs, env_name in envs:
+        agents = []
+        # Dynamic Programming (if applicable)
+        if hasattr(env_cls, 'get_states') and hasattr(env_cls, 'state'):
+            agents += [(PolicyIteration, 200, "pi", "policies"), (ValueIteration, 200, "vi", "policies")]
+        agents += [
+            (OnPolicyFirstVisitMC, episodes_mc, "mc_on", "q_values"),
+            (SARSA, episodes_td, "sarsa", "q_values"),
+            (QLearning, episodes_td, "ql", "q_values"),
+            (DynaQ, episodes_td, "dyna", "q_values"),
+        ]
+        for agent_cls, episodes, agent_name, folder in agents:
+            name = f"{agent_name}_{env_name}"
+            jobs.append(make_job(env_cls, agent_cls, episodes, name, env_kwargs,
+                                 save_path=f"saved_models/{folder}/{name}.pkl"))
+
+    # Secret Environments (TD only for demo)
+    for i in range(4):
+        name = f"ql_secret_{i}"
+        jobs.append(make_job(SecretEnvWrapper, QLearning, 1000, name, {"env_id": i},
+                             save_path=f"saved_models/q_values/{name}.pkl"))
+    return jobs
+
+def main_parallel():
+    print("🚀 Starting Global Training Experiment (parallel)")
+    run_grid(build_jobs())
+    print("\n✅ All trainings completed!")
+
 if __name__ == "__main__":
-    main()
+    if "--parallel" in sys.argv:
+        main_parallel()
+    else:
+        main()
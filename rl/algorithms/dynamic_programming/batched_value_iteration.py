@@ -0,0 +1,119 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from tqdm import tqdm
+from ...environments.tabular_model import CSRMatrix, TabularModel, SparseTabularModel, compile_model
+
+class BatchedValueIteration:
+    """
+    Value Iteration over K MDPs at once.
+    Members are (model, gamma) pairs: pass one model (or environment) and K gammas,
+    K models and one gamma, or K of each. All members are backed up together in one
+    vectorized loop; each member has its own convergence mask and stops changing once
+    its delta falls below theta.
+    - A single shared model is used as is: P V is computed for all K value vectors at once.
+    - Distinct models are padded to the same (S, A) and stacked block-diagonally in a CSRMatrix.
+    """
+
+    def __init__(self, models, gammas=0.99, theta=1e-6):
+        models = list(models) if isinstance(models, (list, tuple)) else [models]
+        gammas = np.atleast_1d(np.asarray(gammas, dtype=np.float64))
+        K = max(len(models), len(gammas))
+        if len(models) not in (1, K) or len(gammas) not in (1, K):
+            raise ValueError(f"Cannot broadcast {len(models)} models with {len(gammas)} gammas")
+
+        # Environments are compiled (and cached) on the way in
+        models = [m if isinstance(m, TabularModel) else compile_model(m) for m in models]
+        self.models = models * K if len(models) == 1 else models
+        self.gammas = np.broadcast_to(gammas, (K,)).copy()
+        self.theta = theta
+        self.n_members = K
+        self.shared = len(models) == 1
+        self.iterations = np.zeros(K, dtype=np.int64)
+        self.converged = np.zeros(K, dtype=bool)
+        self._stack()
+
+    def _stack(self):
+        """Builds the padded [K, S, A] arrays and, for distinct models, the block-diagonal P"""
+        K = self.n_members
+        S = max(m.n_states for m in self.models)
+        A = max(m.n_actions for m in self.models)
+        self.n_states, self.n_actions = S, A
+
+        # Padding states are terminal, padding actions are unavailable
+        self.R = np.zeros((K, S, A))
+        self.action_mask = np.zeros((K, S, A), dtype=bool)
+        self.terminal = np.ones((K, S), dtype=bool)
+        for k, m in enumerate(self.models):
+            self.R[k, :m.n_states, :m.n_actions] = m.R
+            self.action_mask[k, :m.n_states, :m.n_actions] = m.action_mask
+            self.terminal[k, :m.n_states] = m.terminal
+
+        if self.shared:
+            self.P = None
+            return
+
+        rows, cols, probs = [], [], []
+        for k, m in enumerate(self.models):
+            if isinstance(m, SparseTabularModel):
+                src, dst, p = m.P.row_ids, m.P.indices, m.P.data
+            else:
+                src, dst = np.nonzero(m.P.reshape(m.n_states * m.n_actions, m.n_states))
+                p = m.P.reshape(m.n_states * m.n_actions, m.n_states)[src, dst]
+            s, a = src // m.n_actions, src % m.n_actions
+            rows.append((k * S + s) * A + a)
+            cols.append(k * S + dst)
+            probs.append(p)
+
+        rows, cols, probs = np.concatenate(rows), np.concatenate(cols), np.concatenate(probs)
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(K * S * A + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=K * S * A), out=indptr[1:])
+        self.P = CSRMatrix(indptr, cols[order], probs[order], (K * S * A, K * S))
+
+    def _expected_values(self, V: np.ndarray) -> np.ndarray:
+        """sum_s' P_k[s, a, s'] V[k, s'] for every member, as a [K, S, A] array"""
+        K, S, A = self.n_members, self.n_states, self.n_actions
+        if not self.shared:
+            return (self.P @ V.reshape(-1)).reshape(K, S, A)
+
+        model = self.models[0]
+        if isinstance(model, SparseTabularModel):
+            columns = [model.P @ V[k] for k in range(K)]
+            return np.stack(columns).reshape(K, S, A)
+        return (model.P.reshape(S * A, S) @ V.T).T.reshape(K, S, A)
+
+    def q_values(self, V: np.ndarray) -> np.ndarray:
+        """Q[k, s, a] for every member, -inf for unavailable actions"""
+        Q = self.R + self.gammas[:, None, None] * self._expected_values(V)
+        return np.where(self.action_mask, Q, -np.inf)
+
+    def solve(self, max_iterations=1000) -> List[Tuple[Dict, Dict]]:
+        """Runs Value Iteration on every member and returns their (policy, V)"""
+        K, S = self.n_members, self.n_states
+        V = np.zeros((K, S))
+        active = np.ones(K, dtype=bool)
+        self.iterations[:] = 0
+
+        pbar = tqdm(range(max_iterations), desc="Batched Value Iteration")
+        for iteration in pbar:
+            V_new = np.max(self.q_values(V), axis=2)
+            V_new[self.terminal] = 0.0
+            delta = np.max(np.abs(V_new - V), axis=1)
+
+            # Converged members keep their values
+            V = np.where(active[:, None], V_new, V)
+            self.iterations[active] += 1
+            active &= delta >= self.theta
+            if not active.any():
+                pbar.set_postfix({"status": "converged"})
+                break
+            pbar.set_postfix({"active": int(active.sum())})
+
+        self.converged = ~active
+        best_actions = np.argmax(self.q_values(V), axis=2)
+
+        results = []
+        for k, m in enumerate(self.models):
+            policy = m.policy_from_indices(best_actions[k, :m.n_states])
+            results.append((policy, m.to_state_dict(V[k, :m.n_states])))
+        return results
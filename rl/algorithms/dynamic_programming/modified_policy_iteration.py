@@ -0,0 +1,84 @@
+import numpy as np
+from typing import Dict, Tuple
+from tqdm import tqdm
+from ..base_agent import BaseAgent
+from ...environments.tabular_model import compile_model
+
+class ModifiedPolicyIteration(BaseAgent):
+    """
+    Modified Policy Iteration Algorithm
+    Alternates a greedy improvement step with k truncated evaluation sweeps of the
+    improved policy. k=1 behaves like Value Iteration, k -> infinity like Policy Iteration.
+    With k="adaptive", evaluation sweeps run until their change falls below
+    `eval_ratio` times the current Bellman residual (at most `k_max` sweeps).
+    """
+
+    def __init__(self, env, gamma=0.99, theta=1e-6, model=None, k=5, k_max=100, eval_ratio=0.1):
+        super().__init__(env)
+        if k != "adaptive" and (not isinstance(k, int) or k < 1):
+            raise ValueError(f"Invalid number of evaluation sweeps: {k}")
+        self.gamma = gamma
+        self.theta = theta
+        self.k = k
+        self.k_max = k_max
+        self.eval_ratio = eval_ratio
+        self.model = model  # Compiled TabularModel (built on first use if None)
+        self.V = {}
+        self.policy = {}
+        self.total_sweeps = 0
+
+    def _partial_evaluation(self, pi: np.ndarray, V: np.ndarray, residual: float) -> np.ndarray:
+        """Runs the truncated evaluation sweeps of the policy pi, starting from V"""
+        P_pi, R_pi = self.model.policy_model(pi)
+
+        if self.k == "adaptive":
+            n_sweeps, tolerance = self.k_max, max(self.theta, self.eval_ratio * residual)
+        else:
+            # The improvement step already counts as the first sweep
+            n_sweeps, tolerance = self.k - 1, 0.0
+
+        for _ in range(n_sweeps):
+            V_new = R_pi + self.gamma * (P_pi @ V)
+            delta = np.max(np.abs(V_new - V))
+            V = V_new
+            self.total_sweeps += 1
+            if delta < tolerance:
+                break
+
+        return V
+
+    def train(self, max_iterations=1000) -> Tuple[Dict, Dict]:
+        """Trains the agent using Modified Policy Iteration"""
+        if self.model is None:
+            self.model = compile_model(self.env)
+        model = self.model
+
+        V = np.zeros(model.n_states)
+        self.total_sweeps = 0
+
+        pbar = tqdm(range(max_iterations), desc="Modified Policy Iteration")
+        for iteration in pbar:
+            # Policy Improvement (one Bellman optimality backup)
+            Q = model.q_values(V, self.gamma)
+            pi = np.argmax(Q, axis=1)
+            V_new = np.max(Q, axis=1)
+            V_new[model.terminal] = 0.0
+            residual = float(np.max(np.abs(V_new - V))) if model.n_states else 0.0
+            V = V_new
+            self.total_sweeps += 1
+
+            if residual < self.theta:
+                pbar.set_postfix({"status": "converged", "sweeps": self.total_sweeps})
+                break
+
+            # Truncated Policy Evaluation
+            V = self._partial_evaluation(pi, V, residual)
+
+        best_actions = np.argmax(model.q_values(V, self.gamma), axis=1)
+        self.policy = model.policy_from_indices(best_actions)
+        self.V = model.to_state_dict(V)
+
+        return self.policy, self.V
+
+    def act(self, state):
+        return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
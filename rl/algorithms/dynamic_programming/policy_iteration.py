@@ -2,114 +2,142 @@ import numpy as np
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from ...environments.tabular_model import CSRMatrix, compile_model
 
 class PolicyIteration(BaseAgent):
     """
     Policy Iteration Algorithm
     Requires a complete model of the environment (P and R) or the ability to simulate any state-action.
+    The environment is compiled once into a TabularModel; all backups are array operations on it.
+    Evaluation backends:
+    - "direct": dense solve of (I - gamma * P_pi) V = R_pi (small MDPs)
+    - "iterative": synchronous sweeps V <- R_pi + gamma * P_pi V until delta < theta
+    - "gauss_seidel": in-place sweeps, state by state, until delta < theta
+    - "auto": "direct" up to `direct_max_states` states when gamma < 1, "iterative" otherwise
+    At gamma = 1, I - P_pi is singular for most policies; "direct" then falls back to "iterative".
+    With warm_start, each evaluation starts from the previous iteration's V instead of 0.
     """
-    
-    def __init__(self, env, gamma=0.99, theta=1e-6):
+
+    EVALUATIONS = ("auto", "direct", "iterative", "gauss_seidel")
+
+    def __init__(self, env, gamma=0.99, theta=1e-6, model=None,
+                 evaluation="auto", warm_start=True, direct_max_states=500):
         super().__init__(env)
+        if evaluation not in self.EVALUATIONS:
+            raise ValueError(f"Invalid evaluation backend: {evaluation}")
         self.gamma = gamma
         self.theta = theta
+        self.evaluation = evaluation
+        self.warm_start = warm_start
+        self.direct_max_states = direct_max_states
+        self.model = model  # Compiled TabularModel (built on first use if None)
         self.V = {}  # Value function
         self.policy = {}  # Policy (deterministic)
-        
-    def policy_evaluation(self, policy: Dict) -> Dict:
-        """Evaluates a given policy"""
-        states = self.env.get_states()
-        V = {s: 0.0 for s in states}
-        
+
+    def _get_model(self):
+        if self.model is None:
+            self.model = compile_model(self.env)
+        return self.model
+
+    def _backend(self) -> str:
+        if self.evaluation != "auto":
+            return self.evaluation
+        if self.gamma < 1 and self._get_model().n_states <= self.direct_max_states:
+            return "direct"
+        return "iterative"
+
+    def _evaluate(self, pi: np.ndarray, V0: np.ndarray = None) -> np.ndarray:
+        """Evaluates a policy given as an array of action indices, optionally starting from V0"""
+        model = self._get_model()
+        # Terminal rows are zeroed, so terminal states keep a value of 0
+        P_pi, R_pi = model.policy_model(pi)
+
+        backend = self._backend()
+        if backend == "direct":
+            if isinstance(P_pi, CSRMatrix):
+                P_pi = P_pi.toarray()
+            A = np.eye(model.n_states) - self.gamma * P_pi
+            try:
+                return np.linalg.solve(A, R_pi)
+            except np.linalg.LinAlgError:
+                backend = "iterative"
+
+        V = np.zeros(model.n_states) if V0 is None else V0.copy()
+        if backend == "gauss_seidel":
+            return self._gauss_seidel(P_pi, R_pi, V)
+
         while True:
-            delta = 0
-            for state in states:
-                # We assume the env has a way to check if state is terminal
-                # If not explicitly in BaseEnv, we might need to add it or handle it
-                if hasattr(self.env, 'is_terminal') and self.env.is_terminal(state):
-                    continue
-                    
-                v = V[state]
-                action = policy[state]
-                
-                # Simulate the action to get next_state and reward
-                # This approach assumes we can teleport the env to any state
-                self.env.reset()
-                if hasattr(self.env, 'current_pos'):
-                    self.env.current_pos = state
-                elif hasattr(self.env, 'state'):
-                    self.env.state = state
-                
-                next_state, reward, done, _ = self.env.step(action)
-                
-                V[state] = reward + self.gamma * V[next_state]
-                delta = max(delta, abs(v - V[state]))
-            
+            V_new = R_pi + self.gamma * (P_pi @ V)
+            delta = np.max(np.abs(V_new - V)) if model.n_states else 0.0
+            V = V_new
             if delta < self.theta:
                 break
-        
+
         return V
-    
+
+    def _gauss_seidel(self, P_pi, R_pi: np.ndarray, V: np.ndarray) -> np.ndarray:
+        non_terminal = np.flatnonzero(~self._get_model().terminal)
+        if isinstance(P_pi, CSRMatrix):
+            row_dot = P_pi.dot_row
+        else:
+            row_dot = lambda s, V: P_pi[s] @ V
+        while True:
+            delta = 0.0
+            for s in non_terminal:
+                v = V[s]
+                V[s] = R_pi[s] + self.gamma * row_dot(s, V)
+                delta = max(delta, abs(v - V[s]))
+            if delta < self.theta:
+                break
+        return V
+
+    def _improve(self, V: np.ndarray) -> np.ndarray:
+        """Returns the greedy action indices with respect to V"""
+        return np.argmax(self._get_model().q_values(V, self.gamma), axis=1)
+
+    def policy_evaluation(self, policy: Dict, V: Dict = None) -> Dict:
+        """Evaluates a given policy, optionally warm-started from V"""
+        model = self._get_model()
+        V0 = None if V is None else np.array([V[s] for s in model.states])
+        V = self._evaluate(model.policy_to_indices(policy), V0)
+        return model.to_state_dict(V)
+
     def policy_improvement(self, V: Dict) -> Tuple[Dict, bool]:
         """Improves the policy based on the value function"""
-        policy_stable = True
-        new_policy = {}
-        states = self.env.get_states()
-        
-        for state in states:
-            if hasattr(self.env, 'is_terminal') and self.env.is_terminal(state):
-                # Random action for terminal state or 0
-                actions = self.env.get_actions(state)
-                new_policy[state] = actions[0] if actions else 0
-                continue
-            
-            old_action = self.policy.get(state)
-            
-            # Find the best action
-            action_values = []
-            for action in self.env.get_actions(state):
-                self.env.reset()
-                if hasattr(self.env, 'current_pos'):
-                    self.env.current_pos = state
-                elif hasattr(self.env, 'state'):
-                    self.env.state = state
-                    
-                next_state, reward, done, _ = self.env.step(action)
-                action_value = reward + self.gamma * V[next_state]
-                action_values.append((action, action_value))
-            
-            best_action = max(action_values, key=lambda x: x[1])[0]
-            new_policy[state] = best_action
-            
-            if old_action != best_action:
-                policy_stable = False
-        
+        model = self._get_model()
+        V = np.array([V[s] for s in model.states])
+        new_policy = model.policy_from_indices(self._improve(V))
+        policy_stable = all(self.policy.get(s) == a for s, a in new_policy.items())
         return new_policy, policy_stable
-    
+
     def train(self, episodes=None) -> Tuple[Dict, Dict]:
         """Trains the agent using Policy Iteration"""
-        states = self.env.get_states()
+        model = self._get_model()
         # Initialize policy randomly
-        self.policy = {s: np.random.choice(self.env.get_actions(s)) for s in states}
-        
+        self.policy = {s: np.random.choice(self.env.get_actions(s)) for s in model.states}
+        pi = model.policy_to_indices(self.policy)
+
+        V = None
         iteration = 0
         pbar = tqdm(desc="Policy Iteration")
         while True:
             # Policy Evaluation
-            self.V = self.policy_evaluation(self.policy)
-            
+            V = self._evaluate(pi, V if self.warm_start else None)
+
             # Policy Improvement
-            self.policy, policy_stable = self.policy_improvement(self.V)
-            
+            new_pi = self._improve(V)
+            policy_stable = np.array_equal(new_pi, pi)
+            pi = new_pi
+
             iteration += 1
             pbar.update(1)
             if policy_stable:
                 pbar.set_postfix({"status": "converged", "iters": iteration})
                 pbar.close()
                 break
-        
-        return self.policy, self.V
-        
+
+        self.V = model.to_state_dict(V)
+        self.policy = model.policy_from_indices(pi)
         return self.policy, self.V
 
     def act(self, state):
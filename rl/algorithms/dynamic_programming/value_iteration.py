@@ -1,82 +1,124 @@
+import heapq
 import numpy as np
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from ...environments.tabular_model import compile_model
 
 class ValueIteration(BaseAgent):
     """
     Value Iteration Algorithm
     Requires a complete model of the environment.
+    The environment is compiled once into a TabularModel; all backups are array operations on it.
+    Modes:
+    - "vectorized": each sweep is one batched backup Q = R + gamma * P V, then max over actions
+    - "sweep": in-place (Gauss-Seidel) backups, state by state
+    - "prioritized": asynchronous prioritized sweeping; only states whose Bellman error
+      exceeds theta are backed up, in order of decreasing error, and a backup re-queues
+      the state's predecessors
     """
-    
-    def __init__(self, env, gamma=0.99, theta=1e-6):
+
+    MODES = ("vectorized", "sweep", "prioritized")
+
+    def __init__(self, env, gamma=0.99, theta=1e-6, model=None, mode="vectorized"):
         super().__init__(env)
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid mode: {mode}")
         self.gamma = gamma
         self.theta = theta
+        self.mode = mode
+        self.model = model  # Compiled TabularModel (built on first use if None)
         self.V = {}
         self.policy = {}
-    
+        self.n_backups = 0
+
+    def _vectorized_sweep(self, V: np.ndarray) -> Tuple[np.ndarray, float]:
+        """One synchronous Bellman optimality backup over every state"""
+        V_new = np.max(self.model.q_values(V, self.gamma), axis=1)
+        V_new[self.model.terminal] = 0.0
+        delta = float(np.max(np.abs(V_new - V))) if V.size else 0.0
+        self.n_backups += int(np.count_nonzero(~self.model.terminal))
+        return V_new, delta
+
+    def _in_place_sweep(self, V: np.ndarray) -> Tuple[np.ndarray, float]:
+        """One in-place Bellman optimality backup, state by state"""
+        model = self.model
+        delta = 0.0
+        non_terminal = np.flatnonzero(~model.terminal)
+        for s in non_terminal:
+            v = V[s]
+
+            # Calculate max_a Q(s,a)
+            V[s] = np.max(model.q_row(s, V, self.gamma))
+            delta = max(delta, abs(v - V[s]))
+        self.n_backups += len(non_terminal)
+        return V, delta
+
+    def _prioritized_sweeping(self, max_backups: int) -> np.ndarray:
+        """Asynchronous value iteration driven by a priority queue keyed by Bellman error"""
+        model = self.model
+        indptr, predecessors = model.predecessors()
+        V = np.zeros(model.n_states)
+
+        def bellman_error(s):
+            return abs(np.max(model.q_row(s, V, self.gamma)) - V[s])
+
+        # Max-heap of (-error, state); priority[s] is the error of the latest entry for s
+        priority = np.zeros(model.n_states)
+        heap = []
+        for s in np.flatnonzero(~model.terminal):
+            error = bellman_error(s)
+            if error > self.theta:
+                priority[s] = error
+                heap.append((-error, s))
+        heapq.heapify(heap)
+
+        while heap and self.n_backups < max_backups:
+            error, s = heapq.heappop(heap)
+            if -error != priority[s]:
+                continue  # Stale entry
+            priority[s] = 0.0
+
+            V[s] = np.max(model.q_row(s, V, self.gamma))
+            self.n_backups += 1
+
+            for p in predecessors[indptr[s]:indptr[s + 1]]:
+                if model.terminal[p]:
+                    continue
+                error = bellman_error(p)
+                if error > self.theta and error != priority[p]:
+                    priority[p] = error
+                    heapq.heappush(heap, (-error, p))
+
+        return V
+
     def train(self, max_iterations=1000) -> Tuple[Dict, Dict]:
         """Trains the agent using Value Iteration"""
-        states = self.env.get_states()
-        # Initialize V
-        self.V = {s: 0.0 for s in states}
-        
-        pbar = tqdm(range(max_iterations), desc="Value Iteration")
-        for iteration in pbar:
-            delta = 0
-            
-            for state in states:
-                if hasattr(self.env, 'is_terminal') and self.env.is_terminal(state):
-                    continue
-                
-                v = self.V[state]
-                
-                # Calculate max_a Q(s,a)
-                action_values = []
-                for action in self.env.get_actions(state):
-                    self.env.reset()
-                    if hasattr(self.env, 'current_pos'):
-                        self.env.current_pos = state
-                    elif hasattr(self.env, 'state'):
-                        self.env.state = state
-                    
-                    next_state, reward, done, _ = self.env.step(action)
-                    action_value = reward + self.gamma * self.V[next_state]
-                    action_values.append(action_value)
-                
-                if action_values:
-                    self.V[state] = max(action_values)
-                delta = max(delta, abs(v - self.V[state]))
-            
-            if delta < self.theta:
-                pbar.set_postfix({"status": "converged"})
-                break
-        
-        # Extract optimal policy
-        
-        # Extract optimal policy
-        for state in states:
-            if hasattr(self.env, 'is_terminal') and self.env.is_terminal(state):
-                actions = self.env.get_actions(state)
-                self.policy[state] = actions[0] if actions else 0
-                continue
-            
-            action_values = []
-            for action in self.env.get_actions(state):
-                self.env.reset()
-                if hasattr(self.env, 'current_pos'):
-                    self.env.current_pos = state
-                elif hasattr(self.env, 'state'):
-                    self.env.state = state
-                    
-                next_state, reward, done, _ = self.env.step(action)
-                action_value = reward + self.gamma * self.V[next_state]
-                action_values.append((action, action_value))
-            
-            if action_values:
-                self.policy[state] = max(action_values, key=lambda x: x[1])[0]
-        
+        if self.model is None:
+            self.model = compile_model(self.env)
+        model = self.model
+
+        self.n_backups = 0
+        if self.mode == "prioritized":
+            # Same budget as max_iterations full sweeps
+            V = self._prioritized_sweeping(max_iterations * model.n_states)
+        else:
+            # Initialize V
+            V = np.zeros(model.n_states)
+            sweep = self._vectorized_sweep if self.mode == "vectorized" else self._in_place_sweep
+
+            pbar = tqdm(range(max_iterations), desc="Value Iteration")
+            for iteration in pbar:
+                V, delta = sweep(V)
+                if delta < self.theta:
+                    pbar.set_postfix({"status": "converged"})
+                    break
+
+        # Extract optimal policy with a single argmax over actions
+        best_actions = np.argmax(model.q_values(V, self.gamma), axis=1)
+        self.policy = model.policy_from_indices(best_actions)
+        self.V = model.to_state_dict(V)
+
         return self.policy, self.V
 
     def act(self, state):
@@ -1,8 +1,9 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from ...utils.q_table import QTable
+from ...utils.return_stats import ReturnStats
 
 class MonteCarloES(BaseAgent):
     """
@@ -12,8 +13,8 @@ class MonteCarloES(BaseAgent):
     def __init__(self, env, gamma=0.99):
         super().__init__(env)
         self.gamma = gamma
-        self.Q = defaultdict(lambda: defaultdict(float))
-        self.returns = defaultdict(lambda: defaultdict(list))
+        self.Q = QTable.from_env(env)
+        self.returns = ReturnStats(self.Q)  # Running mean/variance of returns per (s, a)
         self.policy = {}
     
     def generate_episode(self, start_state, start_action):
@@ -80,16 +81,12 @@ class MonteCarloES(BaseAgent):
                 # First-visit MC
                 if (state, action) not in visited:
                     visited.add((state, action))
-                    self.returns[state][action].append(G)
-                    self.Q[state][action] = np.mean(self.returns[state][action])
+                    self.Q.set(state, action, self.returns.update(state, action, G))
                     
                     # Policy improvement
-                    best_action = max(self.Q[state].items(), key=lambda x: x[1])[0]
-                    self.policy[state] = best_action
+                    self.policy[state] = self.Q.argmax(state)
         
-        return self.policy, dict(self.Q)
-        
-        return self.policy, dict(self.Q)
+        return self.policy, self.Q.to_dict()
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
@@ -1,9 +1,10 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from .parallel_mc import train_off_policy_parallel
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
 
 class OffPolicyMC(BaseAgent):
     """
@@ -15,8 +16,8 @@ class OffPolicyMC(BaseAgent):
         self.gamma = gamma
         self.epsilon = epsilon
         self.behavior_policy_helper = EpsilonGreedyPolicy(epsilon)
-        self.Q = defaultdict(lambda: defaultdict(float))
-        self.C = defaultdict(lambda: defaultdict(float))  # Cumulative weights
+        self.Q = QTable.from_env(env)
+        self.C = QTable.from_env(env)  # Cumulative weights
         self.target_policy = {}  # Greedy policy
     
     def generate_episode(self):
@@ -26,9 +27,9 @@ class OffPolicyMC(BaseAgent):
         done = False
         
         while not done:
-            actions = self.env.get_actions(state)
-            q_values = [self.Q[state][a] for a in actions]
-            action = self.behavior_policy_helper.select_action(q_values, actions)
+            s = self.Q.index(state)
+            columns = self.Q.columns(s)
+            action = self.Q.actions[self.behavior_policy_helper.select_action(self.Q.values[s, columns], columns)]
             
             next_state, reward, done, _ = self.env.step(action)
             episode.append((state, action, reward))
@@ -48,17 +49,17 @@ class OffPolicyMC(BaseAgent):
                 state, action, reward = episode[t]
                 G = self.gamma * G + reward
                 
-                self.C[state][action] += W
-                self.Q[state][action] += (W / self.C[state][action]) * (G - self.Q[state][action])
+                self.C.add(state, action, W)
+                q = self.Q.get(state, action)
+                self.Q.add(state, action, (W / self.C.get(state, action)) * (G - q))
                 
                 # Update target policy (greedy)
-                if self.Q[state]:
-                    best_action = max(self.Q[state].items(), key=lambda x: x[1])[0]
-                    self.target_policy[state] = best_action
-                    
-                    # If action != best_action, stop
-                    if action != best_action:
-                        break
+                best_action = self.Q.argmax(state)
+                self.target_policy[state] = best_action
+                
+                # If action != best_action, stop
+                if action != best_action:
+                    break
                 
                 # Importance sampling ratio
                 # behavior: epsilon-greedy, target: greedy
@@ -69,9 +70,14 @@ class OffPolicyMC(BaseAgent):
                 else:
                     W *= 1.0 / (self.epsilon / num_actions)
         
-        return self.target_policy, dict(self.Q)
-        
-        return self.target_policy, dict(self.Q)
+        return self.target_policy, self.Q.to_dict()
+
+    def train_parallel(self, episodes=10000, n_workers=None, batch_size=100) -> Tuple[Dict, Dict]:
+        """
+        Weighted importance sampling with episodes generated by worker processes under a snapshot
+        of the current policies; the learner merges their weighted return sums and weights C.
+        """
+        return train_off_policy_parallel(self, episodes, n_workers, batch_size)
 
     def act(self, state):
         return self.target_policy.get(state, np.random.choice(self.env.get_actions(state)))
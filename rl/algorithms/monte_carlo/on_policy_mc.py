@@ -1,9 +1,11 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from .parallel_mc import train_on_policy_parallel
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
+from ...utils.return_stats import ReturnStats
 
 class OnPolicyFirstVisitMC(BaseAgent):
     """
@@ -14,8 +16,8 @@ class OnPolicyFirstVisitMC(BaseAgent):
         super().__init__(env)
         self.gamma = gamma
         self.epsilon_greedy = EpsilonGreedyPolicy(epsilon)
-        self.Q = defaultdict(lambda: defaultdict(float))
-        self.returns = defaultdict(lambda: defaultdict(list))
+        self.Q = QTable.from_env(env)
+        self.returns = ReturnStats(self.Q)  # Running mean/variance of returns per (s, a)
         self.policy = {}
     
     def generate_episode(self):
@@ -25,9 +27,9 @@ class OnPolicyFirstVisitMC(BaseAgent):
         done = False
         
         while not done:
-            actions = self.env.get_actions(state)
-            q_values = [self.Q[state][a] for a in actions]
-            action = self.epsilon_greedy.select_action(q_values, actions)
+            s = self.Q.index(state)
+            columns = self.Q.columns(s)
+            action = self.Q.actions[self.epsilon_greedy.select_action(self.Q.values[s, columns], columns)]
             
             next_state, reward, done, _ = self.env.step(action)
             episode.append((state, action, reward))
@@ -35,31 +37,38 @@ class OnPolicyFirstVisitMC(BaseAgent):
         
         return episode
     
+    def first_visit_returns(self, episode):
+        """Yields (state, action, G) for each (s, a) pair of the episode, walking back from the end"""
+        G = 0
+        visited = set()
+        
+        for t in range(len(episode) - 1, -1, -1):
+            state, action, reward = episode[t]
+            G = self.gamma * G + reward
+            
+            if (state, action) not in visited:
+                visited.add((state, action))
+                yield state, action, G
+    
     def train(self, episodes=10000) -> Tuple[Dict, Dict]:
         """Trains the agent using On-policy First-visit MC"""
         for episode_num in tqdm(range(episodes), desc="On-policy MC"):
             episode = self.generate_episode()
             
-            G = 0
-            visited = set()
-            
-            for t in range(len(episode) - 1, -1, -1):
-                state, action, reward = episode[t]
-                G = self.gamma * G + reward
+            for state, action, G in self.first_visit_returns(episode):
+                self.Q.set(state, action, self.returns.update(state, action, G))
                 
-                if (state, action) not in visited:
-                    visited.add((state, action))
-                    self.returns[state][action].append(G)
-                    self.Q[state][action] = np.mean(self.returns[state][action])
-            
-            # Extract greedy policy
-            for state in self.Q:
-                if self.Q[state]:
-                    self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+                # Greedy policy improvement of the touched state
+                self.policy[state] = self.Q.argmax(state)
         
-        return self.policy, dict(self.Q)
+        return self.policy, self.Q.to_dict()
+
+    def train_parallel(self, episodes=10000, n_workers=None, batch_size=100) -> Tuple[Dict, Dict]:
+        """
+        Same estimator, with episodes generated by worker processes under a snapshot of the
+        current policy; the learner merges their return statistics after each round.
+        """
+        return train_on_policy_parallel(self, episodes, n_workers, batch_size)
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
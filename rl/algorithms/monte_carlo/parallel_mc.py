@@ -0,0 +1,117 @@
+import copy
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+from tqdm import tqdm
+from ...environments.base_env import build_env
+from ...utils.return_stats import ReturnStats
+
+# Each worker process holds its own copy of the agent, with an environment built in the worker
+_worker_agent = None
+
+def _init_worker(agent, env_spec):
+    global _worker_agent
+    agent.env = build_env(env_spec)
+    _worker_agent = agent
+
+def _load_snapshot(agent, values: np.ndarray, best: np.ndarray, seed: int):
+    """Points the worker's agent at the learner's current Q and reseeds every random source"""
+    agent.Q.values[:] = values
+    agent.Q.best[:] = best
+    np.random.seed(seed)
+    random.seed(seed)
+    for helper in ('epsilon_greedy', 'behavior_policy_helper'):
+        if hasattr(agent, helper):
+            getattr(agent, helper).seed(seed)
+
+def _on_policy_batch(values, best, n_episodes, seed):
+    """First-visit return statistics (count, mean, M2) of n_episodes episodes"""
+    agent = _worker_agent
+    _load_snapshot(agent, values, best, seed)
+    stats = ReturnStats(agent.Q)
+    for _ in range(n_episodes):
+        for state, action, G in agent.first_visit_returns(agent.generate_episode()):
+            stats.update(state, action, G)
+    return stats.arrays()
+
+def _off_policy_batch(values, best, n_episodes, seed):
+    """Importance weights C and weighted return sums W * G of n_episodes behavior episodes"""
+    agent = _worker_agent
+    _load_snapshot(agent, values, best, seed)
+    Q = agent.Q
+    C = np.zeros_like(Q.values)
+    WG = np.zeros_like(Q.values)
+    for _ in range(n_episodes):
+        episode = agent.generate_episode()
+        G = 0
+        W = 1.0
+        for t in range(len(episode) - 1, -1, -1):
+            state, action, reward = episode[t]
+            G = agent.gamma * G + reward
+            s, a = Q.index(state), Q.action_index[action]
+            C[s, a] += W
+            WG[s, a] += W * G
+
+            # The target policy is greedy w.r.t. the snapshot
+            if a != Q.best[s]:
+                break
+            num_actions = len(Q.columns(s))
+            W *= 1.0 / ((1 - agent.epsilon) + agent.epsilon / num_actions)
+    return C, WG
+
+def _rounds(episodes: int, n_workers: int, batch_size: int):
+    """Splits the episodes into rounds of at most n_workers batches of batch_size"""
+    remaining = episodes
+    while remaining > 0:
+        sizes = []
+        while remaining > 0 and len(sizes) < n_workers:
+            sizes.append(min(batch_size, remaining))
+            remaining -= sizes[-1]
+        yield sizes
+
+def _run_rounds(agent, batch_fn, merge_fn, episodes, n_workers, batch_size, desc):
+    n_workers = n_workers or os.cpu_count() or 1
+    Q = agent.Q
+    # Workers build their own env from its spec (see build_env)
+    shipped = copy.copy(agent)
+    shipped.env = None
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(shipped, agent.env.env_spec())) as pool:
+        with tqdm(total=episodes, desc=desc) as progress:
+            for sizes in _rounds(episodes, n_workers, batch_size):
+                seeds = np.random.randint(2 ** 31, size=len(sizes))
+                futures = [pool.submit(batch_fn, Q.values, Q.best, n, int(seed)) for n, seed in zip(sizes, seeds)]
+                for future in futures:
+                    merge_fn(*future.result())
+                progress.update(sum(sizes))
+
+def _refresh_q(Q, estimates: np.ndarray, touched: np.ndarray):
+    """Q[s, a] <- estimates[s, a] for the touched pairs, keeping visited/best in sync"""
+    rows, cols = np.nonzero(touched)
+    Q.add_at(rows, cols, estimates[rows, cols] - Q.values[rows, cols])
+
+def train_on_policy_parallel(agent, episodes, n_workers=None, batch_size=100) -> Tuple[Dict, Dict]:
+    """Parallel OnPolicyFirstVisitMC.train: Q is the merged mean of the first-visit returns"""
+    def merge(count, mean, m2):
+        agent.returns.merge(ReturnStats.from_arrays(agent.Q, count, mean, m2))
+        _refresh_q(agent.Q, agent.returns.mean, count > 0)
+
+    _run_rounds(agent, _on_policy_batch, merge, episodes, n_workers, batch_size, "On-policy MC (parallel)")
+    agent.policy = agent.Q.greedy_policy()
+    return agent.policy, agent.Q.to_dict()
+
+def train_off_policy_parallel(agent, episodes, n_workers=None, batch_size=100) -> Tuple[Dict, Dict]:
+    """Parallel OffPolicyMC.train: Q is the weighted importance-sampling average sum(W G) / C"""
+    def merge(C, WG):
+        Q = agent.Q
+        weighted = Q.values * agent.C.values + WG
+        touched = C > 0
+        agent.C.add_at(*np.nonzero(touched), C[touched])
+        _refresh_q(Q, np.divide(weighted, agent.C.values, out=np.zeros_like(weighted),
+                                where=agent.C.values > 0), touched)
+
+    _run_rounds(agent, _off_policy_batch, merge, episodes, n_workers, batch_size, "Off-policy MC (parallel)")
+    agent.target_policy = agent.Q.greedy_policy()
+    return agent.target_policy, agent.Q.to_dict()
@@ -1,9 +1,10 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from ..temporal_difference.actor_learner import train_actor_learner
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
 
 class DynaQ(BaseAgent):
     """
@@ -18,7 +19,7 @@ class DynaQ(BaseAgent):
         self.epsilon_greedy = EpsilonGreedyPolicy(epsilon)
         self.n_planning_steps = n_planning_steps
         
-        self.Q = defaultdict(lambda: defaultdict(float))
+        self.Q = QTable.from_env(env)
         self.model = {}  # Model[s][a] = (r, s')
         self.policy = {}
     
@@ -27,10 +28,10 @@ class DynaQ(BaseAgent):
         if done:
             target = reward
         else:
-            max_q = max(self.Q[next_state].values()) if self.Q[next_state] else 0.0
+            max_q = self.Q.max(next_state)
             target = reward + self.gamma * max_q
         
-        self.Q[state][action] += self.alpha * (target - self.Q[state][action])
+        self.Q.add(state, action, self.alpha * (target - self.Q.get(state, action)))
     
     def planning(self):
         """Planning steps using the learned model"""
@@ -58,9 +59,9 @@ class DynaQ(BaseAgent):
             done = False
             
             while not done:
-                actions = self.env.get_actions(state)
-                q_values = [self.Q[state][a] for a in actions]
-                action = self.epsilon_greedy.select_action(q_values, actions)
+                s = self.Q.index(state)
+                columns = self.Q.columns(s)
+                action = self.Q.actions[self.epsilon_greedy.select_action(self.Q.values[s, columns], columns)]
                 
                 next_state, reward, done, _ = self.env.step(action)
                 
@@ -78,13 +79,13 @@ class DynaQ(BaseAgent):
                 state = next_state
         
         # Extract greedy policy
+        self.policy = self.Q.greedy_policy()
         
-        # Extract greedy policy
-        for state in self.Q:
-            if self.Q[state]:
-                self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+        return self.policy, self.Q.to_dict()
+
+    def train_actor_learner(self, episodes=5000, n_actors=None, batch_size=64, seed=None) -> Tuple[Dict, Dict]:
+        """Trains with actor processes feeding batched transitions to this learner (see actor_learner.py)"""
+        return train_actor_learner(self, 'dyna_q', episodes, n_actors, batch_size, seed=seed)
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
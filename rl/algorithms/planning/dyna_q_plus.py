@@ -1,9 +1,9 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
 
 class DynaQPlus(BaseAgent):
     """
@@ -20,9 +20,9 @@ class DynaQPlus(BaseAgent):
         self.n_planning_steps = n_planning_steps
         self.kappa = kappa  # Exploration bonus
         
-        self.Q = defaultdict(lambda: defaultdict(float))
+        self.Q = QTable.from_env(env)
         self.model = {}  # Model[s][a] = (reward, next_state)
-        self.last_visit = defaultdict(lambda: defaultdict(int))  # Time since last visit
+        self.last_visit = QTable.from_env(env, dtype=np.int64)  # Time step of last visit
         self.time_step = 0
         self.policy = {}
     
@@ -31,10 +31,10 @@ class DynaQPlus(BaseAgent):
         if done:
             target = reward + bonus
         else:
-            max_q = max(self.Q[next_state].values()) if self.Q[next_state] else 0.0
+            max_q = self.Q.max(next_state)
             target = reward + bonus + self.gamma * max_q
         
-        self.Q[state][action] += self.alpha * (target - self.Q[state][action])
+        self.Q.add(state, action, self.alpha * (target - self.Q.get(state, action)))
     
     def planning(self):
         """Planning steps with exploration bonus"""
@@ -52,7 +52,7 @@ class DynaQPlus(BaseAgent):
             done = hasattr(self.env, 'is_terminal') and self.env.is_terminal(next_state)
             
             # Calculate exploration bonus
-            tau = self.time_step - self.last_visit[state][action]
+            tau = self.time_step - self.last_visit.get(state, action)
             bonus = self.kappa * np.sqrt(tau)
             
             self.q_learning_update(state, action, reward, next_state, done, bonus)
@@ -64,9 +64,9 @@ class DynaQPlus(BaseAgent):
             done = False
             
             while not done:
-                actions = self.env.get_actions(state)
-                q_values = [self.Q[state][a] for a in actions]
-                action = self.epsilon_greedy.select_action(q_values, actions)
+                s = self.Q.index(state)
+                columns = self.Q.columns(s)
+                action = self.Q.actions[self.epsilon_greedy.select_action(self.Q.values[s, columns], columns)]
                 
                 next_state, reward, done, _ = self.env.step(action)
                 
@@ -77,7 +77,7 @@ class DynaQPlus(BaseAgent):
                 if state not in self.model:
                     self.model[state] = {}
                 self.model[state][action] = (reward, next_state)
-                self.last_visit[state][action] = self.time_step
+                self.last_visit.set(state, action, self.time_step)
                 
                 # Planning
                 self.planning()
@@ -86,13 +86,9 @@ class DynaQPlus(BaseAgent):
                 self.time_step += 1
         
         # Extract greedy policy
+        self.policy = self.Q.greedy_policy()
         
-        # Extract greedy policy
-        for state in self.Q:
-            if self.Q[state]:
-                self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+        return self.policy, self.Q.to_dict()
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
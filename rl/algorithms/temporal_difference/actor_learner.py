@@ -0,0 +1,248 @@
+import copy
+import os
+import random
+import time
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+from tqdm import tqdm
+from ...environments.base_env import build_env
+from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
+
+# Header slots of a ring: transitions written, transitions read, actor finished flag
+WRITE, READ, FINISHED = 0, 1, 2
+# Transition fields, stored as Q-table row/column indices; next_a is the actor's next action (SARSA)
+FIELDS = (('s', np.int64), ('a', np.int64), ('r', np.float64), ('s2', np.int64), ('done', np.bool_),
+          ('next_a', np.int64))
+
+class TransitionRing:
+    """
+    Single-producer / single-consumer ring buffer of transitions in shared memory.
+    The actor only advances WRITE and the learner only advances READ, so neither side locks:
+    the actor waits while the ring is full, and publishes a batch by bumping WRITE after the
+    slots are filled.
+    """
+
+    def __init__(self, capacity: int, name: str = None):
+        self.capacity = capacity
+        size = 8 * 3 + sum(capacity * np.dtype(dtype).itemsize for _, dtype in FIELDS)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.header = np.ndarray((3,), dtype=np.int64, buffer=self.shm.buf)
+        offset = self.header.nbytes
+        self.fields = {}
+        for field, dtype in FIELDS:
+            self.fields[field] = np.ndarray((capacity,), dtype=dtype, buffer=self.shm.buf, offset=offset)
+            offset += self.fields[field].nbytes
+        if name is None:
+            self.header[:] = 0
+
+    def __getstate__(self):
+        return {'capacity': self.capacity, 'name': self.shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'], state['name'])
+
+    def lag(self) -> int:
+        """Transitions written but not yet consumed"""
+        return int(self.header[WRITE] - self.header[READ])
+
+    def push(self, batch: Dict[str, np.ndarray]):
+        n = len(batch['s'])
+        while self.capacity - self.lag() < n:
+            time.sleep(1e-4)
+        slots = (self.header[WRITE] + np.arange(n)) % self.capacity
+        for field, values in batch.items():
+            self.fields[field][slots] = values
+        self.header[WRITE] += n
+
+    def pop(self) -> Dict[str, np.ndarray]:
+        n = self.lag()
+        slots = (self.header[READ] + np.arange(n)) % self.capacity
+        batch = {field: values[slots] for field, values in self.fields.items()}
+        self.header[READ] += n
+        return batch
+
+    def close(self, unlink: bool = False):
+        self.header = self.fields = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _actor(env_spec, layout: QTable, ring: TransitionRing, values_name: str, dtype, n_episodes: int,
+           epsilon: float, batch_size: int, seed_seq):
+    """Steps its own environment epsilon-greedily w.r.t. the last published Q values"""
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    published = np.ndarray((layout.n_states, layout.n_actions), dtype=dtype, buffer=values_shm.buf)
+    try:
+        np.random.seed(seed_seq.generate_state(1)[0])
+        random.seed(int(seed_seq.generate_state(1)[0]))
+        env = build_env(env_spec)
+        policy_helper = EpsilonGreedyPolicy(epsilon, rng=np.random.default_rng(seed_seq))
+        # Local snapshot, refreshed once per batch instead of read while the learner writes
+        values = published.copy()
+
+        def choose(s):
+            columns = layout.columns(s)
+            return policy_helper.select_action(values[s, columns], columns)
+
+        batch = {field: [] for field, _ in FIELDS}
+        for _ in range(n_episodes):
+            s = layout.index(env.reset())
+            a = choose(s)
+            done = False
+            while not done:
+                next_state, reward, done, _ = env.step(layout.actions[a])
+                s2 = layout.index(next_state)
+                next_a = choose(s2)
+                for field, value in zip(batch, (s, a, reward, s2, done, next_a)):
+                    batch[field].append(value)
+
+                if len(batch['s']) == batch_size:
+                    ring.push({field: np.asarray(values) for field, values in batch.items()})
+                    batch = {field: [] for field in batch}
+                    values[:] = published
+                s, a = s2, next_a
+
+        if batch['s']:
+            ring.push({field: np.asarray(values) for field, values in batch.items()})
+        ring.header[FINISHED] = 1
+    finally:
+        del published
+        values_shm.close()
+        ring.close()
+
+
+class _Learner:
+    """Vectorized updates of a batch of transitions, per agent type"""
+
+    def __init__(self, agent, method: str):
+        self.agent = agent
+        self.method = method
+        Q = agent.Q
+        if method == 'dyna_q':
+            # Deterministic model, last observed outcome per (s, a), as in DynaQ.model
+            self.model_seen = np.zeros(Q.values.shape, dtype=bool)
+            self.model_reward = np.zeros(Q.values.shape)
+            self.model_next = np.zeros(Q.values.shape, dtype=np.int64)
+            self.model_done = np.zeros(Q.values.shape, dtype=bool)
+
+    def _q_update(self, s, a, r, s2, done, bootstrap):
+        agent, Q = self.agent, self.agent.Q
+        Q.move_towards(s, a, r + agent.gamma * np.where(done, 0.0, bootstrap), agent.alpha)
+
+    def update(self, batch: Dict[str, np.ndarray]):
+        Q = self.agent.Q
+        s, a, r, s2, done = batch['s'], batch['a'], batch['r'], batch['s2'], batch['done']
+        if self.method == 'sarsa':
+            self._q_update(s, a, r, s2, done, Q.values[s2, batch['next_a']])
+            return
+        self._q_update(s, a, r, s2, done, Q.max_rows(s2))
+        if self.method == 'dyna_q':
+            self.model_seen[s, a] = True
+            self.model_reward[s, a] = r
+            self.model_next[s, a] = s2
+            self.model_done[s, a] = done
+            self._plan(len(s) * self.agent.n_planning_steps)
+
+    def _plan(self, n: int):
+        """n simulated updates: a random observed state, then a random observed action of it"""
+        if n == 0:
+            return
+        Q = self.agent.Q
+        seen_states = np.flatnonzero(self.model_seen.any(axis=1))
+        s = seen_states[np.random.randint(len(seen_states), size=n)]
+        a = np.where(self.model_seen[s], np.random.random((n, Q.n_actions)), -1.0).argmax(axis=1)
+        s2 = self.model_next[s, a]
+        self._q_update(s, a, self.model_reward[s, a], s2, self.model_done[s, a], Q.max_rows(s2))
+
+
+def train_actor_learner(agent, method: str, episodes, n_actors=None, batch_size=64,
+                        capacity=8192, seed=None) -> Tuple[Dict, Dict]:
+    """
+    Actor-learner training for QLearning ('q_learning'), SARSA ('sarsa') and DynaQ ('dyna_q').
+    n_actors processes (one per CPU, minus the learner, by default) step their own copies of the
+    environment and push batches of (s, a, r, s', done) into per-actor shared-memory rings; this
+    process applies vectorized updates and publishes a snapshot of the Q values after each round.
+    Actors act epsilon-greedily on the snapshot they last copied, so SARSA is on-policy up to
+    that lag. Throughput and queue lag are stored in agent.actor_learner_stats.
+    """
+    if not isinstance(agent.Q, QTable):
+        raise ValueError("Actor-learner training needs a dense QTable (sparse=False)")
+    if batch_size > capacity:
+        raise ValueError(f"batch_size {batch_size} does not fit in a ring of capacity {capacity}")
+    n_actors = n_actors or max(1, (os.cpu_count() or 1) - 1)
+    Q = agent.Q
+    # QLearning/SARSA call their helper policy_helper, DynaQ epsilon_greedy
+    helper = agent.policy_helper if hasattr(agent, 'policy_helper') else agent.epsilon_greedy
+    learner = _Learner(agent, method)
+
+    layout = copy.copy(Q)
+    layout.values = layout.visited = layout.best = None
+    rings = [TransitionRing(capacity) for _ in range(n_actors)]
+    values_shm = shared_memory.SharedMemory(create=True, size=Q.values.nbytes)
+    published = np.ndarray(Q.values.shape, dtype=Q.values.dtype, buffer=values_shm.buf)
+    published[:] = Q.values
+
+    shares = [episodes // n_actors + (i < episodes % n_actors) for i in range(n_actors)]
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_actors)
+    env_spec = agent.env.env_spec()
+    actors = [
+        mp.Process(target=_actor, args=(env_spec, layout, rings[i], values_shm.name, Q.values.dtype,
+                                        shares[i], helper.epsilon, batch_size, seed_seqs[i]))
+        for i in range(n_actors)
+    ]
+    lags = []
+    steps = 0
+    start = time.time()
+    try:
+        for actor in actors:
+            actor.start()
+        with tqdm(desc=f"Actor-learner {method}", unit=" steps") as progress:
+            while True:
+                finished = all(ring.header[FINISHED] for ring in rings)
+                crashed = [i for i, actor in enumerate(actors) if actor.exitcode not in (None, 0)]
+                if crashed:
+                    raise RuntimeError(f"Actors {crashed} exited with an error")
+
+                lags.append(sum(ring.lag() for ring in rings))
+                consumed = 0
+                for ring in rings:
+                    batch = ring.pop()
+                    if len(batch['s']):
+                        learner.update(batch)
+                        consumed += len(batch['s'])
+                if consumed:
+                    published[:] = Q.values
+                steps += consumed
+                progress.update(consumed)
+
+                if consumed == 0:
+                    if finished:
+                        break
+                    time.sleep(1e-4)
+        for actor in actors:
+            actor.join()
+    finally:
+        elapsed = time.time() - start
+        for actor in actors:
+            if actor.is_alive():
+                actor.terminate()
+        del published
+        values_shm.close()
+        values_shm.unlink()
+        for ring in rings:
+            ring.close(unlink=True)
+
+    lags = np.array(lags)
+    agent.actor_learner_stats = {
+        'actors': n_actors, 'steps': steps, 'seconds': elapsed,
+        'steps_per_second': steps / max(elapsed, 1e-9),
+        'mean_queue_lag': float(lags.mean()), 'max_queue_lag': int(lags.max()),
+    }
+
+    # Extract greedy policy
+    agent.policy = Q.greedy_policy()
+    return agent.policy, Q.to_dict()
@@ -0,0 +1,51 @@
+import numpy as np
+from typing import Dict, Tuple
+from tqdm import tqdm
+from ..base_agent import BaseAgent
+from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
+
+class BatchedQLearning(BaseAgent):
+    """
+    Q-Learning on a VectorEnvironment
+    All copies share one Q-table; each step selects N actions at once and applies the N updates
+    from the same Q snapshot (a repeated (s, a) pair moves towards its mean target).
+    Vector environments number their states 0..n_states-1, so states index Q rows directly.
+    """
+
+    def __init__(self, vec_env, alpha=0.1, gamma=0.99, epsilon=0.1):
+        super().__init__(vec_env)
+        self.alpha = alpha
+        self.gamma = gamma
+        self.policy_helper = EpsilonGreedyPolicy(epsilon)
+        self.Q = QTable.from_env(vec_env)
+        self.action_ids = np.asarray(self.Q.actions)
+        self.policy = {}
+
+    def train(self, episodes=5000) -> Tuple[Dict, Dict]:
+        """Steps all copies until `episodes` episodes have finished in total"""
+        Q = self.Q
+        states = self.env.reset()
+        finished = 0
+        with tqdm(total=episodes, desc="Batched Q-Learning") as progress:
+            while finished < episodes:
+                a = self.policy_helper.select_actions(Q.values[states], Q.action_mask[states])
+
+                next_states, rewards, dones = self.env.step(self.action_ids[a])
+
+                # Finished copies were reset: their target is the reward alone
+                targets = rewards + self.gamma * np.where(dones, 0.0, Q.max_rows(next_states))
+                Q.move_towards(states, a, targets, self.alpha)
+
+                states = next_states
+                n_done = int(dones.sum())
+                finished += n_done
+                progress.update(n_done)
+
+        # Extract greedy policy
+        self.policy = Q.greedy_policy()
+
+        return self.policy, Q.to_dict()
+
+    def act(self, state):
+        return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
@@ -1,9 +1,9 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import make_q_table
 
 class ExpectedSARSA(BaseAgent):
     """
@@ -11,49 +11,39 @@ class ExpectedSARSA(BaseAgent):
     Uses expected value over next actions instead of sample
     """
     
-    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1):
+    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1, sparse=None):
         super().__init__(env)
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.policy_helper = EpsilonGreedyPolicy(epsilon)
-        self.Q = defaultdict(lambda: defaultdict(float))
+        self.Q = make_q_table(env, sparse)
         self.policy = {}
     
     def expected_q_value(self, state):
         """Calculates expected Q value under epsilon-greedy policy"""
-        if not self.Q[state]:
-            return 0.0
+        q_values = self.Q.row(state)
+        n_actions = len(q_values)
         
-        actions = self.env.get_actions(state)
-        n_actions = len(actions)
+        # Epsilon spread over all actions, the rest on the best one
+        probs = np.full(n_actions, self.epsilon / n_actions)
+        probs[np.argmax(q_values)] += 1 - self.epsilon
         
-        # Find the best action
-        best_action = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        # Calculate expectation
-        expected_value = 0.0
-        for action in actions:
-            if action == best_action:
-                prob = (1 - self.epsilon) + self.epsilon / n_actions
-            else:
-                prob = self.epsilon / n_actions
-            expected_value += prob * self.Q[state][action]
-        
-        return expected_value
+        return probs @ q_values
     
     def train(self, episodes=5000) -> Tuple[Dict, Dict]:
         """Trains the agent using Expected SARSA"""
+        Q = self.Q
         for episode_num in tqdm(range(episodes), desc="Expected SARSA"):
             state = self.env.reset()
             done = False
             
             while not done:
-                actions = self.env.get_actions(state)
-                q_values = [self.Q[state][a] for a in actions]
-                action = self.policy_helper.select_action(q_values, actions)
+                s = Q.index(state)
+                columns = Q.columns(s)
+                a = self.policy_helper.select_action(Q.values[s, columns], columns)
                 
-                next_state, reward, done, _ = self.env.step(action)
+                next_state, reward, done, _ = self.env.step(Q.actions[a])
                 
                 # Expected SARSA update
                 if done:
@@ -62,18 +52,14 @@ class ExpectedSARSA(BaseAgent):
                     expected_q = self.expected_q_value(next_state)
                     target = reward + self.gamma * expected_q
                 
-                self.Q[state][action] += self.alpha * (target - self.Q[state][action])
+                Q.write(s, a, Q.values[s, a] + self.alpha * (target - Q.values[s, a]))
                 
                 state = next_state
         
         # Extract greedy policy
+        self.policy = Q.greedy_policy()
         
-        # Extract greedy policy
-        for state in self.Q:
-            if self.Q[state]:
-                self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+        return self.policy, Q.to_dict()
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
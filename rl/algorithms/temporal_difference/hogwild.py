@@ -0,0 +1,124 @@
+import copy
+import os
+import random
+import time
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+from ...environments.base_env import build_env
+from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import QTable
+
+def _attach(name: str, shape, dtype) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _hogwild_worker(env_spec, layout: QTable, names: Dict, n_episodes: int, seed_seq, alpha, gamma, epsilon,
+                    worker_id):
+    """Actor loop: own environment and RNG streams, lock-free updates of the shared Q array"""
+    shape = (layout.n_states, layout.n_actions)
+    shm_values, values = _attach(names['values'], shape, names['dtype'])
+    shm_visited, visited = _attach(names['visited'], shape[:1], bool)
+    shm_steps, steps = _attach(names['steps'], (names['n_workers'],), np.int64)
+    try:
+        np.random.seed(seed_seq.generate_state(1)[0])
+        random.seed(int(seed_seq.generate_state(1)[0]))
+        env = build_env(env_spec)
+        policy_helper = EpsilonGreedyPolicy(epsilon, rng=np.random.default_rng(seed_seq))
+        n_steps = 0
+        for _ in range(n_episodes):
+            state = env.reset()
+            done = False
+            while not done:
+                s = layout.index(state)
+                columns = layout.columns(s)
+                a = policy_helper.select_action(values[s, columns], columns)
+
+                next_state, reward, done, _ = env.step(layout.actions[a])
+
+                # Q-Learning update (off-policy: use max), read and written without locks
+                if done:
+                    target = reward
+                else:
+                    next_s = layout.index(next_state)
+                    target = reward + gamma * values[next_s, layout.columns(next_s)].max()
+                values[s, a] += alpha * (target - values[s, a])
+                visited[s] = True
+
+                state = next_state
+                n_steps += 1
+        steps[worker_id] = n_steps
+    finally:
+        del values, visited, steps
+        shm_values.close()
+        shm_visited.close()
+        shm_steps.close()
+
+def train_hogwild(agent, episodes, n_workers=None, seed=None) -> Tuple[Dict, Dict]:
+    """
+    Hogwild Q-learning: n_workers processes (one per CPU by default) each run their share of the
+    episodes on their own copy of the environment, updating one Q array in shared memory without
+    locks. Worker RNG streams are spawned from np.random.SeedSequence(seed).
+    Throughput is stored in agent.hogwild_stats.
+    """
+    if not isinstance(agent.Q, QTable):
+        raise ValueError("Hogwild training needs a dense QTable (sparse=False)")
+    n_workers = n_workers or os.cpu_count() or 1
+    Q = agent.Q
+    blocks = {
+        'values': shared_memory.SharedMemory(create=True, size=Q.values.nbytes),
+        'visited': shared_memory.SharedMemory(create=True, size=max(Q.visited.nbytes, 1)),
+        'steps': shared_memory.SharedMemory(create=True, size=8 * n_workers),
+    }
+    try:
+        values = np.ndarray(Q.values.shape, dtype=Q.values.dtype, buffer=blocks['values'].buf)
+        visited = np.ndarray(Q.visited.shape, dtype=bool, buffer=blocks['visited'].buf)
+        steps = np.ndarray((n_workers,), dtype=np.int64, buffer=blocks['steps'].buf)
+        values[:] = Q.values
+        visited[:] = Q.visited
+        steps[:] = 0
+
+        names = {key: shm.name for key, shm in blocks.items()}
+        names['n_workers'] = n_workers
+        names['dtype'] = Q.values.dtype
+        # Workers receive the table layout only; the values live in shared memory
+        layout = copy.copy(Q)
+        layout.values = layout.visited = layout.best = None
+
+        shares = [episodes // n_workers + (i < episodes % n_workers) for i in range(n_workers)]
+        seed_seqs = np.random.SeedSequence(seed).spawn(n_workers)
+        start = time.time()
+        workers = [
+            mp.Process(target=_hogwild_worker,
+                       args=(agent.env.env_spec(), layout, names, shares[i], seed_seqs[i],
+                             agent.alpha, agent.gamma, agent.policy_helper.epsilon, i))
+            for i in range(n_workers)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.time() - start
+
+        Q.values[:] = values
+        Q.visited[:] = visited
+        total_steps = int(steps.sum())
+        # Views must be released before the blocks can be closed
+        del values, visited, steps
+    finally:
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
+
+    failed = [i for i, w in enumerate(workers) if w.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Hogwild workers {failed} exited with an error")
+
+    Q.refresh()
+    agent.hogwild_stats = {'workers': n_workers, 'steps': total_steps, 'seconds': elapsed,
+                           'steps_per_second': total_steps / max(elapsed, 1e-9)}
+
+    # Extract greedy policy
+    agent.policy = Q.greedy_policy()
+    return agent.policy, Q.to_dict()
@@ -0,0 +1,135 @@
+import copy
+import numpy as np
+from typing import Dict, List, Tuple
+from tqdm import tqdm
+from ...utils.q_table import QTable
+
+METHODS = ('q_learning', 'sarsa', 'expected_sarsa')
+
+class LockstepTDTrainer:
+    """
+    K independent tabular TD runs advanced together, one environment step per iteration.
+    Q is a [K, S, A] tensor and copy k of a VectorEnvironment with K copies belongs to run k.
+    Runs differ by alpha, epsilon and gamma (each a scalar or K values) and by their random draws:
+    run k draws from its own Generator, seeded with seeds[k] when K seeds are given and with the
+    k-th child of SeedSequence(seeds) for a single seed. A run's draws therefore do not depend on
+    the other runs, and a run reproduces on its own with the same seed.
+    A run stops updating once it has finished its episodes.
+    """
+
+    def __init__(self, vec_env, method='q_learning', alphas=0.1, gammas=0.99, epsilons=0.1, seeds=0):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        K = vec_env.n_envs
+        params = [np.atleast_1d(np.asarray(p, dtype=np.float64)) for p in (alphas, gammas, epsilons)]
+        for p in params:
+            if len(p) not in (1, K):
+                raise ValueError(f"Cannot broadcast {len(p)} values to {K} runs (vec_env.n_envs)")
+        self.alphas, self.gammas, self.epsilons = (np.broadcast_to(p, (K,)).copy() for p in params)
+
+        self.env = vec_env
+        self.method = method
+        self.n_runs = K
+        self.rngs = self._run_generators(seeds, K)
+
+        # Layout shared by all runs; vector environments number states 0..n_states-1
+        self.template = QTable.from_env(vec_env)
+        self.action_ids = np.asarray(self.template.actions)
+        self.action_mask = self.template.action_mask
+        self.Q = np.zeros((K, self.template.n_states, self.template.n_actions))
+        self.visited = np.zeros((K, self.template.n_states), dtype=bool)
+        self.episode_returns = None
+        self.episode_lengths = None
+
+    @staticmethod
+    def _run_generators(seeds, K) -> List[np.random.Generator]:
+        if np.ndim(seeds) == 0:
+            return [np.random.default_rng(child) for child in np.random.SeedSequence(seeds).spawn(K)]
+        if len(seeds) != K:
+            raise ValueError(f"Cannot match {len(seeds)} seeds to {K} runs (vec_env.n_envs)")
+        return [np.random.default_rng(np.random.SeedSequence(seed)) for seed in seeds]
+
+    def _select(self, runs, states, Q):
+        """Epsilon-greedy action index of every run, each drawing a fixed number of uniforms from its own Generator"""
+        n_actions = Q.shape[2]
+        draws = np.stack([rng.random(2 * n_actions + 1) for rng in self.rngs])
+        tie_keys, explore_keys, u = draws[:, :n_actions], draws[:, n_actions:-1], draws[:, -1]
+
+        mask = self.action_mask[states]
+        masked = np.where(mask, Q[runs, states], -np.inf)
+        ties = masked == masked.max(axis=1, keepdims=True)
+        chosen = np.where(ties, tie_keys, -1.0).argmax(axis=1)
+        explore = u < self.epsilons
+        chosen[explore] = np.where(mask, explore_keys, -1.0)[explore].argmax(axis=1)
+        return chosen
+
+    def _next_values(self, runs, next_states, next_a, Q):
+        """Bootstrap value of the next state of every run, per method"""
+        mask = self.action_mask[next_states]
+        q_next = np.where(mask, Q[runs, next_states], -np.inf)
+        if self.method == 'q_learning':
+            return q_next.max(axis=1)
+        if self.method == 'sarsa':
+            return Q[runs, next_states, next_a]
+
+        # Expected SARSA: epsilon spread over the available actions, the rest on the greedy one
+        n_available = mask.sum(axis=1)
+        probs = mask * (self.epsilons / n_available)[:, None]
+        probs[runs, q_next.argmax(axis=1)] += 1 - self.epsilons
+        return (probs * np.where(mask, q_next, 0.0)).sum(axis=1)
+
+    def train(self, episodes=5000) -> List[Tuple[Dict, Dict]]:
+        """Runs `episodes` episodes per run; returns each run's (policy, Q) and records learning curves"""
+        K = self.n_runs
+        Q = self.Q
+        runs = np.arange(K)
+        self.episode_returns = np.zeros((K, episodes))
+        self.episode_lengths = np.zeros((K, episodes), dtype=np.int64)
+        completed = np.zeros(K, dtype=np.int64)
+        ep_return = np.zeros(K)
+        ep_length = np.zeros(K, dtype=np.int64)
+
+        states = self.env.reset()
+        a = self._select(runs, states, Q)
+        with tqdm(total=K * episodes, desc=f"Lockstep {self.method} x{K}") as progress:
+            while True:
+                active = completed < episodes
+                if not active.any():
+                    break
+
+                next_states, rewards, dones = self.env.step(self.action_ids[a])
+                next_a = self._select(runs, next_states, Q)
+
+                # Finished copies were reset: their target is the reward alone
+                next_values = np.where(dones, 0.0, self._next_values(runs, next_states, next_a, Q))
+                targets = rewards + self.gammas * next_values
+                update = self.alphas * (targets - Q[runs, states, a])
+                Q[runs, states, a] += np.where(active, update, 0.0)
+                self.visited[runs[active], states[active]] = True
+
+                ep_return += rewards
+                ep_length += 1
+                finished = dones & active
+                done_runs = runs[finished]
+                self.episode_returns[done_runs, completed[done_runs]] = ep_return[done_runs]
+                self.episode_lengths[done_runs, completed[done_runs]] = ep_length[done_runs]
+                completed += finished
+                ep_return[dones] = 0.0
+                ep_length[dones] = 0
+                progress.update(len(done_runs))
+
+                states, a = next_states, next_a
+
+        return [self._run_result(k) for k in range(K)]
+
+    def run_table(self, k: int) -> QTable:
+        """QTable view of run k"""
+        table = copy.copy(self.template)
+        table.values = self.Q[k]
+        table.visited = self.visited[k]
+        table.best = np.where(self.action_mask, self.Q[k], -np.inf).argmax(axis=1)
+        return table
+
+    def _run_result(self, k: int) -> Tuple[Dict, Dict]:
+        table = self.run_table(k)
+        return table.greedy_policy(), table.to_dict()
@@ -1,9 +1,11 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from .actor_learner import train_actor_learner
+from .hogwild import train_hogwild
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import make_q_table
 
 class QLearning(BaseAgent):
     """
@@ -11,46 +13,50 @@ class QLearning(BaseAgent):
     Off-policy TD Control
     """
     
-    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1):
+    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1, sparse=None):
         super().__init__(env)
         self.alpha = alpha
         self.gamma = gamma
         self.policy_helper = EpsilonGreedyPolicy(epsilon)
-        self.Q = defaultdict(lambda: defaultdict(float))
+        self.Q = make_q_table(env, sparse)
         self.policy = {}
     
     def train(self, episodes=5000) -> Tuple[Dict, Dict]:
         """Trains the agent using Q-Learning"""
+        Q = self.Q
         for episode_num in tqdm(range(episodes), desc="Q-Learning"):
             state = self.env.reset()
             done = False
             
             while not done:
-                actions = self.env.get_actions(state)
-                q_values = [self.Q[state][a] for a in actions]
-                action = self.policy_helper.select_action(q_values, actions)
+                s = Q.index(state)
+                columns = Q.columns(s)
+                a = self.policy_helper.select_action(Q.values[s, columns], columns)
                 
-                next_state, reward, done, _ = self.env.step(action)
+                next_state, reward, done, _ = self.env.step(Q.actions[a])
                 
                 # Q-Learning update (off-policy: use max)
                 if done:
                     target = reward
                 else:
-                    max_q = max(self.Q[next_state].values()) if self.Q[next_state] else 0.0
-                    target = reward + self.gamma * max_q
+                    target = reward + self.gamma * Q.max(next_state)
                 
-                self.Q[state][action] += self.alpha * (target - self.Q[state][action])
+                Q.write(s, a, Q.values[s, a] + self.alpha * (target - Q.values[s, a]))
                 
                 state = next_state
         
         # Extract greedy policy
+        self.policy = Q.greedy_policy()
         
-        # Extract greedy policy
-        for state in self.Q:
-            if self.Q[state]:
-                self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+        return self.policy, Q.to_dict()
+
+    def train_hogwild(self, episodes=5000, n_workers=None, seed=None) -> Tuple[Dict, Dict]:
+        """Trains with several actor processes sharing one lock-free Q array (see hogwild.py)"""
+        return train_hogwild(self, episodes, n_workers, seed)
+
+    def train_actor_learner(self, episodes=5000, n_actors=None, batch_size=64, seed=None) -> Tuple[Dict, Dict]:
+        """Trains with actor processes feeding batched transitions to this learner (see actor_learner.py)"""
+        return train_actor_learner(self, 'q_learning', episodes, n_actors, batch_size, seed=seed)
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
@@ -1,9 +1,10 @@
 import numpy as np
-from collections import defaultdict
 from typing import Dict, Tuple
 from tqdm import tqdm
 from ..base_agent import BaseAgent
+from .actor_learner import train_actor_learner
 from ...policies.epsilon_greedy import EpsilonGreedyPolicy
+from ...utils.q_table import make_q_table
 
 class SARSA(BaseAgent):
     """
@@ -11,51 +12,51 @@ class SARSA(BaseAgent):
     On-policy TD Control
     """
     
-    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1):
+    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=0.1, sparse=None):
         super().__init__(env)
         self.alpha = alpha
         self.gamma = gamma
         self.policy_helper = EpsilonGreedyPolicy(epsilon)
-        self.Q = defaultdict(lambda: defaultdict(float))
+        self.Q = make_q_table(env, sparse)
         self.policy = {}
     
     def train(self, episodes=5000) -> Tuple[Dict, Dict]:
         """Trains the agent using SARSA"""
+        Q = self.Q
         for episode_num in tqdm(range(episodes), desc="SARSA"):
-            state = self.env.reset()
+            s = Q.index(self.env.reset())
             
-            actions = self.env.get_actions(state)
-            q_values = [self.Q[state][a] for a in actions]
-            action = self.policy_helper.select_action(q_values, actions)
+            columns = Q.columns(s)
+            a = self.policy_helper.select_action(Q.values[s, columns], columns)
             
             done = False
             
             while not done:
-                next_state, reward, done, _ = self.env.step(action)
+                next_state, reward, done, _ = self.env.step(Q.actions[a])
                 
-                next_actions = self.env.get_actions(next_state)
-                next_q_values = [self.Q[next_state][a] for a in next_actions]
-                next_action = self.policy_helper.select_action(next_q_values, next_actions)
+                next_s = Q.index(next_state)
+                next_columns = Q.columns(next_s)
+                next_a = self.policy_helper.select_action(Q.values[next_s, next_columns], next_columns)
                 
                 # SARSA update
                 if done:
                     target = reward
                 else:
-                    target = reward + self.gamma * self.Q[next_state][next_action]
+                    target = reward + self.gamma * Q.values[next_s, next_a]
                 
-                self.Q[state][action] += self.alpha * (target - self.Q[state][action])
+                Q.write(s, a, Q.values[s, a] + self.alpha * (target - Q.values[s, a]))
                 
-                state = next_state
-                action = next_action
+                s = next_s
+                a = next_a
         
         # Extract greedy policy
+        self.policy = Q.greedy_policy()
         
-        # Extract greedy policy
-        for state in self.Q:
-            if self.Q[state]:
-                self.policy[state] = max(self.Q[state].items(), key=lambda x: x[1])[0]
-        
-        return self.policy, dict(self.Q)
+        return self.policy, Q.to_dict()
+
+    def train_actor_learner(self, episodes=5000, n_actors=None, batch_size=64, seed=None) -> Tuple[Dict, Dict]:
+        """Trains with actor processes feeding batched transitions to this learner (see actor_learner.py)"""
+        return train_actor_learner(self, 'sarsa', episodes, n_actors, batch_size, seed=seed)
 
     def act(self, state):
         return self.policy.get(state, np.random.choice(self.env.get_actions(state)))
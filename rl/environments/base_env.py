@@ -56,3 +56,38 @@ class BaseEnvironment(ABC):
         Returns: next_state, reward, done
         """
         pass
+
+    def transitions(self, state, action):
+        """
+        Exact outcome model of (state, action), for environments that can enumerate it.
+        Returns: list of (prob, next_state, reward), or None if not available
+        """
+        pass
+
+    def config_key(self):
+        """
+        Returns a hashable description of the environment's configuration.
+        Used to cache compiled models: environments whose dynamics depend on
+        constructor arguments must include them. Return None to disable caching.
+        """
+        return (type(self).__name__,)
+
+    def env_spec(self):
+        """
+        Returns (class, kwargs) that build an equivalent environment, so worker processes can
+        construct their own copy instead of receiving this object (native handles do not pickle).
+        Environments with constructor arguments must override it.
+        """
+        return type(self), {}
+
+
+def build_env(env_spec):
+    """
+    Builds an environment from the (class, kwargs) pair of BaseEnvironment.env_spec().
+    Worker processes receive the spec and build their own copy with this, instead of receiving
+    the live environment: it may hold native handles that do not pickle (the secret
+    environments' ctypes instances, under the spawn start method) and its state must not be
+    shared across processes.
+    """
+    env_cls, env_kwargs = env_spec
+    return env_cls(**env_kwargs)
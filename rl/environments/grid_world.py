@@ -69,6 +69,12 @@ class GridWorld(BaseEnvironment):
     
     def is_terminal(self, state: int) -> bool:
         return self._state_to_pos(state) == self.goal_pos
+
+    def config_key(self):
+        return (type(self).__name__, self.size)
+
+    def env_spec(self):
+        return type(self), {'size': self.size}
     
     def render(self):
         print("\n" + "=" * (self.width * 4 + 1))
@@ -90,16 +96,18 @@ class GridWorld(BaseEnvironment):
         print(f"Position: {self.current_pos} | Done: {self.done}\n")
 
     def simulate_step(self, state, action):
-        row, col = state
-        if action == 0:
+        row, col = self._state_to_pos(state)
+        if action == 0:  # Up
             new_pos = (max(0, row - 1), col)
-        elif action == 1:
+        elif action == 1:  # Right
+            new_pos = (row, min(self.width - 1, col + 1))
+        elif action == 2:  # Down
             new_pos = (min(self.height - 1, row + 1), col)
-        elif action == 2:
+        elif action == 3:  # Left
             new_pos = (row, max(0, col - 1))
-        elif action == 3:
-            new_pos = (row, min(self.width - 1, col + 1))
+        else:
+            raise ValueError(f"Invalid action: {action}")
         
         reward = 1.0 if new_pos == self.goal_pos else 0.0
         done = new_pos == self.goal_pos
-        return new_pos, reward, done
+        return self._pos_to_state(new_pos), reward, done
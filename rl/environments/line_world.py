@@ -53,6 +53,12 @@ class LineWorld(BaseEnvironment):
     
     def is_terminal(self, state: int) -> bool:
         return state == self.goal_pos
+
+    def config_key(self):
+        return (type(self).__name__, self.length, self.start_pos, self.goal_pos)
+
+    def env_spec(self):
+        return type(self), {'length': self.length, 'start_pos': self.start_pos, 'goal_pos': self.goal_pos}
     
     def render(self):
         line = ['_'] * self.length
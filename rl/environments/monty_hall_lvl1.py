@@ -46,6 +46,31 @@ class MontyHallLvl1(BaseEnvironment):
             reward = 1.0 if final_choice == self.car else 0.0
             return self.current_state, reward, True, {"final": final_choice, "car": self.car}
 
+    def transitions(self, state: int, action: int) -> List[Tuple[float, int, float]]:
+        """
+        Exact outcome model, enumerating the car, the initial choice and the host's door
+        with the same rules as step().
+        """
+        if state == 0:
+            return [(1.0, 1, 0.0)]
+        if state == 2:
+            return [(1.0, 2, 0.0)]
+
+        p_win = 0.0
+        p_setup = 1.0 / len(self.doors) ** 2
+        for car in self.doors:
+            for first_choice in self.doors:
+                possible_to_open = [d for d in self.doors if d != first_choice and d != car]
+                for opened in possible_to_open:
+                    if action == 1:  # Keep
+                        final_choice = first_choice
+                    else:  # Switch
+                        final_choice = [d for d in self.doors if d != first_choice and d != opened][0]
+                    if final_choice == car:
+                        p_win += p_setup / len(possible_to_open)
+
+        return [(p_win, 2, 1.0), (1.0 - p_win, 2, 0.0)]
+
     def get_actions(self, state: Optional[int] = None) -> List[int]:
         if state == 0:
             return [0]  # Just Wait/Progress
@@ -0,0 +1,126 @@
+import numpy as np
+from typing import List, Tuple
+
+def _sample_actions(rng, policy: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """One action per row from the probability table rows policy[states]"""
+    cdf = np.cumsum(policy[states], axis=1)
+    u = rng.random(len(states)) * cdf[:, -1]
+    return np.minimum((u[:, None] >= cdf).sum(axis=1), policy.shape[1] - 1)
+
+def _random_member(rng, candidates: np.ndarray) -> np.ndarray:
+    """A uniformly random True column per row (arbitrary for rows without one)"""
+    return np.where(candidates, rng.random(candidates.shape), -1.0).argmax(axis=1)
+
+def to_episodes(states: np.ndarray, actions: np.ndarray, rewards: np.ndarray) -> List[List[Tuple]]:
+    """Batched [N, T] trajectories as the MC agents' episodes: lists of (state, action, reward)"""
+    return [list(zip(s, a, r)) for s, a, r in zip(states.tolist(), actions.tolist(), rewards.tolist())]
+
+
+class MontyHallLvl1Sim:
+    """
+    Array-based simulator of MontyHallLvl1: samples the car, the initial choice, the host's door
+    and the keep/switch outcome of N episodes at once, with the same rules and state ids.
+    policy is an [n_states, n_actions] table of action probabilities (uniform over the
+    available actions by default).
+    """
+
+    n_states = 3
+    n_actions = 3
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng(np.random.randint(2 ** 31))
+        self.doors = np.arange(3)
+
+    def random_policy(self) -> np.ndarray:
+        policy = np.zeros((self.n_states, self.n_actions))
+        policy[0, 0] = policy[2, 0] = 1.0
+        policy[1, [1, 2]] = 0.5
+        return policy
+
+    def simulate(self, n_episodes: int, policy: np.ndarray = None):
+        """Returns (states, actions, rewards), each [N, 2]"""
+        rng = self.rng
+        policy = self.random_policy() if policy is None else policy
+        N = n_episodes
+
+        car = rng.integers(3, size=N)
+        first_choice = rng.integers(3, size=N)
+        # Host opens a door that is neither the first choice nor the car
+        can_open = (self.doors != first_choice[:, None]) & (self.doors != car[:, None])
+        opened = _random_member(rng, can_open)
+
+        # Step 1 (state 0) only progresses; step 2 (state 1) keeps or switches
+        states = np.zeros((N, 2), dtype=np.int64)
+        states[:, 1] = 1
+        actions = np.zeros((N, 2), dtype=np.int64)
+        actions[:, 0] = _sample_actions(rng, policy, states[:, 0])
+        actions[:, 1] = _sample_actions(rng, policy, states[:, 1])
+
+        # The switch target is the only door left closed besides the first choice
+        switched = 3 - first_choice - opened
+        final_choice = np.where(actions[:, 1] == 1, first_choice, switched)
+        rewards = np.zeros((N, 2))
+        rewards[:, 1] = final_choice == car
+        return states, actions, rewards
+
+    def win_rate(self, n_episodes: int, policy: np.ndarray = None) -> float:
+        _, _, rewards = self.simulate(n_episodes, policy)
+        return rewards[:, -1].mean()
+
+
+class MontyHallLvl2Sim:
+    """
+    Array-based simulator of MontyHallLvl2 generalized to n_doors doors and n_decisions decisions
+    (the environment is n_doors=5, n_decisions=4). At each step the host opens a closed door that is
+    neither the current choice nor the car, then the agent keeps (0) or switches (1) to a random
+    closed door. State ids are step * n_doors + current choice, as in MontyHallLvl2.
+    """
+
+    n_actions = 2
+
+    def __init__(self, n_doors: int = 5, n_decisions: int = 4, rng=None):
+        self.n_doors = n_doors
+        self.n_decisions = n_decisions
+        self.n_states = (n_decisions + 1) * n_doors
+        self.rng = rng if rng is not None else np.random.default_rng(np.random.randint(2 ** 31))
+        self.doors = np.arange(n_doors)
+
+    def random_policy(self) -> np.ndarray:
+        return np.full((self.n_states, self.n_actions), 0.5)
+
+    def simulate(self, n_episodes: int, policy: np.ndarray = None):
+        """Returns (states, actions, rewards), each [N, n_decisions]"""
+        rng = self.rng
+        policy = self.random_policy() if policy is None else policy
+        N, D, T = n_episodes, self.n_doors, self.n_decisions
+        rows = np.arange(N)
+
+        car = rng.integers(D, size=N)
+        choice = rng.integers(D, size=N)
+        opened = np.zeros((N, D), dtype=bool)
+        states = np.zeros((N, T), dtype=np.int64)
+        actions = np.zeros((N, T), dtype=np.int64)
+
+        for t in range(T):
+            states[:, t] = t * D + choice
+            actions[:, t] = _sample_actions(rng, policy, states[:, t])
+
+            # 1. Host opens a door that is not the current choice, not the car and still closed
+            can_open = ~opened & (self.doors != choice[:, None]) & (self.doors != car[:, None])
+            door = _random_member(rng, can_open)
+            opens = can_open.any(axis=1)
+            opened[rows[opens], door[opens]] = True
+
+            # 2. Switch moves to a random closed door other than the current choice
+            remaining = ~opened & (self.doors != choice[:, None])
+            new_choice = _random_member(rng, remaining)
+            switches = (actions[:, t] == 1) & remaining.any(axis=1)
+            choice = np.where(switches, new_choice, choice)
+
+        rewards = np.zeros((N, T))
+        rewards[:, -1] = choice == car
+        return states, actions, rewards
+
+    def win_rate(self, n_episodes: int, policy: np.ndarray = None) -> float:
+        _, _, rewards = self.simulate(n_episodes, policy)
+        return rewards[:, -1].mean()
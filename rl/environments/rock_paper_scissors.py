@@ -37,8 +37,7 @@ class RockPaperScissors(BaseEnvironment):
         # Round 1: Opponent is random. Round 2: Opponent repeats Agent's Round 1.
         opp_action = np.random.choice(3) if self.current_round == 0 else self.agent_r1
         
-        # Reward: +1 Win, -1 Loss, 0 Tie
-        reward = float([0, 1, -1][(action - opp_action) % 3])
+        reward = self._reward(action, opp_action)
         self.total_reward += reward
         
         if self.current_round == 0:
@@ -56,6 +55,20 @@ class RockPaperScissors(BaseEnvironment):
         
         return self._encode_state(), reward, self.done, info
 
+    @staticmethod
+    def _reward(action: int, opp_action: int) -> float:
+        # Reward: +1 Win, -1 Loss, 0 Tie
+        return float([0, 1, -1][(action - opp_action) % 3])
+
+    def transitions(self, state: int, action: int) -> List[Tuple[float, int, float]]:
+        """Exact outcome model: the round 1 opponent is uniform, the round 2 opponent is deterministic"""
+        if state == 10:
+            return [(1.0, 10, 0.0)]
+        if state == 0:
+            return [(1.0 / 3, 1 + action * 3 + opp, self._reward(action, opp)) for opp in range(3)]
+        agent_r1 = (state - 1) // 3
+        return [(1.0, 10, self._reward(action, agent_r1))]
+
     def get_actions(self, state: Optional[int] = None) -> List[int]:
         return [0, 1, 2]
 
@@ -1,5 +1,9 @@
+import atexit
 import ctypes
+import functools
+import os
 import platform
+import threading
 
 import numpy as np
 
@@ -14,9 +18,26 @@ elif platform.system().lower() == "darwin":
         lib_path = "./libs/libsecret_envs.dylib"
 
 
+def library_path(path: str = None) -> str:
+    """Absolute path of the library to load: path, or the module-level lib_path at call time"""
+    return os.path.abspath(path or lib_path)
+
+
+def load_library(path: str = None) -> ctypes.CDLL:
+    """The secret environments' library, loaded once per resolved path and process"""
+    return _load_library(library_path(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_library(path: str) -> ctypes.CDLL:
+    return ctypes.cdll.LoadLibrary(path)
+
+
 class SecretEnv0Wrapper:
     def __init__(self):
-        self.lib = ctypes.cdll.LoadLibrary(lib_path)
+        # Resolved once, so the wrapper keeps naming the library it actually loaded
+        self.path = library_path()
+        self.lib = load_library(self.path)
 
         # MDP functions
         self.lib.secret_env_0_num_states.argtypes = []
@@ -88,15 +109,17 @@ class SecretEnv0Wrapper:
 class SecretEnv0:
     def __init__(self, wrapper=None, instance=None):
         if wrapper is None:
-            wrapper = SecretEnv0Wrapper()
+            wrapper = shared_wrapper(0)
         self.wrapper = wrapper
+        # Held here so __del__ does not depend on module globals at interpreter shutdown
+        self.pool = shared_pool(0, wrapper)
         if instance is None:
-            instance = self.wrapper.lib.secret_env_0_new()
+            instance = self.pool.acquire()
         self.instance = instance
 
     def __del__(self):
         if self.wrapper is not None:
-            self.wrapper.lib.secret_env_0_delete(self.instance)
+            self.pool.release(self.instance)
 
     # MDP related Methods
     def num_states(self) -> int:
@@ -146,14 +169,16 @@ class SecretEnv0:
 
     @staticmethod
     def from_random_state() -> 'SecretEnv0':
-        wrapper = SecretEnv0Wrapper()
+        wrapper = shared_wrapper(0)
         instance = wrapper.lib.secret_env_0_from_random_state()
         return SecretEnv0(wrapper, instance)
 
 
 class SecretEnv1Wrapper:
     def __init__(self):
-        self.lib = ctypes.cdll.LoadLibrary(lib_path)
+        # Resolved once, so the wrapper keeps naming the library it actually loaded
+        self.path = library_path()
+        self.lib = load_library(self.path)
 
         # MDP functions
         self.lib.secret_env_1_num_states.argtypes = []
@@ -225,15 +250,17 @@ class SecretEnv1Wrapper:
 class SecretEnv1:
     def __init__(self, wrapper=None, instance=None):
         if wrapper is None:
-            wrapper = SecretEnv1Wrapper()
+            wrapper = shared_wrapper(1)
         self.wrapper = wrapper
+        # Held here so __del__ does not depend on module globals at interpreter shutdown
+        self.pool = shared_pool(1, wrapper)
         if instance is None:
-            instance = self.wrapper.lib.secret_env_1_new()
+            instance = self.pool.acquire()
         self.instance = instance
 
     def __del__(self):
         if self.wrapper is not None:
-            self.wrapper.lib.secret_env_1_delete(self.instance)
+            self.pool.release(self.instance)
 
     # MDP related Methods
     def num_states(self) -> int:
@@ -283,13 +310,15 @@ class SecretEnv1:
 
     @staticmethod
     def from_random_state() -> 'SecretEnv1':
-        wrapper = SecretEnv1Wrapper()
+        wrapper = shared_wrapper(1)
         instance = wrapper.lib.secret_env_1_from_random_state()
         return SecretEnv1(wrapper, instance)
 
 class SecretEnv2Wrapper:
     def __init__(self):
-        self.lib = ctypes.cdll.LoadLibrary(lib_path)
+        # Resolved once, so the wrapper keeps naming the library it actually loaded
+        self.path = library_path()
+        self.lib = load_library(self.path)
 
         # MDP functions
         self.lib.secret_env_2_num_states.argtypes = []
@@ -361,15 +390,17 @@ class SecretEnv2Wrapper:
 class SecretEnv2:
     def __init__(self, wrapper=None, instance=None):
         if wrapper is None:
-            wrapper = SecretEnv2Wrapper()
+            wrapper = shared_wrapper(2)
         self.wrapper = wrapper
+        # Held here so __del__ does not depend on module globals at interpreter shutdown
+        self.pool = shared_pool(2, wrapper)
         if instance is None:
-            instance = self.wrapper.lib.secret_env_2_new()
+            instance = self.pool.acquire()
         self.instance = instance
 
     def __del__(self):
         if self.wrapper is not None:
-            self.wrapper.lib.secret_env_2_delete(self.instance)
+            self.pool.release(self.instance)
 
     # MDP related Methods
     def num_states(self) -> int:
@@ -419,14 +450,16 @@ class SecretEnv2:
 
     @staticmethod
     def from_random_state() -> 'SecretEnv2':
-        wrapper = SecretEnv2Wrapper()
+        wrapper = shared_wrapper(2)
         instance = wrapper.lib.secret_env_2_from_random_state()
         return SecretEnv2(wrapper, instance)
 
 
 class SecretEnv3Wrapper:
     def __init__(self):
-        self.lib = ctypes.cdll.LoadLibrary(lib_path)
+        # Resolved once, so the wrapper keeps naming the library it actually loaded
+        self.path = library_path()
+        self.lib = load_library(self.path)
 
         # MDP functions
         self.lib.secret_env_3_num_states.argtypes = []
@@ -498,15 +531,17 @@ class SecretEnv3Wrapper:
 class SecretEnv3:
     def __init__(self, wrapper=None, instance=None):
         if wrapper is None:
-            wrapper = SecretEnv3Wrapper()
+            wrapper = shared_wrapper(3)
         self.wrapper = wrapper
+        # Held here so __del__ does not depend on module globals at interpreter shutdown
+        self.pool = shared_pool(3, wrapper)
         if instance is None:
-            instance = self.wrapper.lib.secret_env_3_new()
+            instance = self.pool.acquire()
         self.instance = instance
 
     def __del__(self):
         if self.wrapper is not None:
-            self.wrapper.lib.secret_env_3_delete(self.instance)
+            self.pool.release(self.instance)
 
     # MDP related Methods
     def num_states(self) -> int:
@@ -556,11 +591,105 @@ class SecretEnv3:
 
     @staticmethod
     def from_random_state() -> 'SecretEnv3':
-        wrapper = SecretEnv3Wrapper()
+        wrapper = shared_wrapper(3)
         instance = wrapper.lib.secret_env_3_from_random_state()
         return SecretEnv3(wrapper, instance)
 
 
+
+class InstancePool:
+    """
+    Native instances of one secret environment kept for reuse: a released handle is reset and
+    handed out again instead of being deleted and a new one allocated.
+    At most max_size idle handles are kept; the rest are deleted.
+    """
+
+    def __init__(self, wrapper, env_id: int, max_size: int = 1024):
+        prefix = f"secret_env_{env_id}_"
+        self._new = getattr(wrapper.lib, prefix + "new")
+        self._reset = getattr(wrapper.lib, prefix + "reset")
+        self._delete = getattr(wrapper.lib, prefix + "delete")
+        self.max_size = max_size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> int:
+        with self._lock:
+            instance = self._idle.pop() if self._idle else None
+        if instance is None:
+            return self._new()
+        self._reset(instance)
+        return instance
+
+    def release(self, instance: int):
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(instance)
+                return
+        self._delete(instance)
+
+    def clear(self):
+        """Deletes every idle handle"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for instance in idle:
+            self._delete(instance)
+
+    def close(self):
+        """Deletes every idle handle, and from now on every released one"""
+        with self._lock:
+            self.max_size = 0
+        self.clear()
+
+    def __len__(self):
+        return len(self._idle)
+
+
+_WRAPPER_CLASSES = {0: SecretEnv0Wrapper, 1: SecretEnv1Wrapper, 2: SecretEnv2Wrapper, 3: SecretEnv3Wrapper}
+_wrappers = {}
+_pools = {}
+_shared_lock = threading.Lock()
+
+
+def shared_wrapper(env_id: int):
+    """
+    Process-wide wrapper of an environment id for the current lib_path: its functions are
+    declared once per library
+    """
+    key = (env_id, library_path())
+    wrapper = _wrappers.get(key)
+    if wrapper is None:
+        with _shared_lock:
+            if key not in _wrappers:
+                _wrappers[key] = _WRAPPER_CLASSES[env_id]()
+            wrapper = _wrappers[key]
+    return wrapper
+
+
+def shared_pool(env_id: int, wrapper=None) -> InstancePool:
+    """
+    Process-wide pool of native instances of an environment id, per library: the one wrapper
+    was loaded from, or the current lib_path
+    """
+    key = (env_id, library_path() if wrapper is None else wrapper.path)
+    pool = _pools.get(key)
+    if pool is None:
+        if wrapper is None:
+            wrapper = shared_wrapper(env_id)
+        with _shared_lock:
+            if key not in _pools:
+                _pools[key] = InstancePool(wrapper, env_id)
+            pool = _pools[key]
+    return pool
+
+
+@atexit.register
+def _close_pools():
+    """Frees the idle native instances of every pool when the interpreter exits"""
+    for pool in list(_pools.values()):
+        pool.close()
+
+
 if __name__ == "__main__":
     env = SecretEnv0()
     print(env.num_states())
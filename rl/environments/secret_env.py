@@ -1,12 +1,16 @@
+import time
 import numpy as np
-from typing import Tuple, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, List, Optional
 from .base_env import BaseEnvironment
+from .vector_env import VectorEnvironment
 import sys
 import os
 
 # Add root to sys.path to import secret_envs_wrapper
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from rl.environments.secret import secret_envs_wrapper
+from rl.environments.secret_model import load_secret_model
 
 class SecretEnvWrapper(BaseEnvironment):
     """
@@ -28,19 +32,37 @@ class SecretEnvWrapper(BaseEnvironment):
         
         self.n_actions = self.env.num_actions()
         self.n_states = self.env.num_states()
+        self._bind()
         self.reset()
 
+    def _bind(self):
+        """
+        Caches the native functions used on every transition, looked up once instead of
+        through self.env.wrapper.lib on each call, and the instance handle they take.
+        """
+        lib = self.env.wrapper.lib
+        prefix = f"secret_env_{self.env_id}_"
+        self._handle = self.env.instance
+        self._c_reset = getattr(lib, prefix + "reset")
+        self._c_step = getattr(lib, prefix + "step")
+        self._c_state_id = getattr(lib, prefix + "state_id")
+        self._c_score = getattr(lib, prefix + "score")
+        self._c_is_game_over = getattr(lib, prefix + "is_game_over")
+
     def reset(self) -> int:
-        self.env.reset()
-        return self.env.state_id()
+        handle = self._handle
+        self._c_reset(handle)
+        # Score after the last transition, so a step needs a single score() call
+        self._score = self._c_score(handle)
+        return self._c_state_id(handle)
 
     def step(self, action: int) -> Tuple[int, float, bool, dict]:
-        prev_score = self.env.score()
-        self.env.step(action)
-        new_state = self.env.state_id()
-        reward = self.env.score() - prev_score
-        done = self.env.is_game_over()
-        return new_state, reward, done, {}
+        handle = self._handle
+        self._c_step(handle, action)
+        score = self._c_score(handle)
+        reward = score - self._score
+        self._score = score
+        return self._c_state_id(handle), reward, self._c_is_game_over(handle), {}
 
     def get_actions(self, state: Optional[int] = None) -> List[int]:
         # Note: In secret environments, available actions might depend on state
@@ -59,9 +81,135 @@ class SecretEnvWrapper(BaseEnvironment):
     def render(self):
         self.env.display()
 
+    def config_key(self):
+        # The library is part of the dynamics: lib_path may point elsewhere later in the process
+        return (type(self).__name__, self.env_id, self.env.wrapper.path)
+
+    def env_spec(self):
+        return type(self), {'env_id': self.env_id}
+
+    def build_model(self, sparse=None):
+        """
+        Exact model built from the library's transition probabilities.
+        The extracted tensors are cached on disk (see secret_model.load_secret_model).
+        """
+        return load_secret_model(self.env, self.env_id, sparse=sparse)
+
     @property
     def state(self):
         return self.env.state_id()
 
     # Note: Secret environments don't seem to support setting state directly easily 
     # except via from_random_state which creates a new instance.
+
+
+class VectorSecretEnv(VectorEnvironment):
+    """
+    N native instances of a secret environment stepped together from an action array.
+    ctypes releases the GIL for the duration of each native call, so the instances are split
+    into n_threads contiguous chunks stepped concurrently on a thread pool.
+    Rewards are score differences as in SecretEnvWrapper.step; finished instances are reset
+    on the same step, so the returned states are their new start states.
+    """
+
+    def __init__(self, env_id: int, n_envs: int, n_threads: int = None):
+        super().__init__(SecretEnvWrapper(env_id), n_envs)
+        template = self.env
+        # Native instances come from the shared pool and go back to it with these objects
+        self.instances = [type(template.env)() for _ in range(n_envs)]
+        self._handles = [instance.instance for instance in self.instances]
+        self._c_reset, self._c_step = template._c_reset, template._c_step
+        self._c_state_id, self._c_score = template._c_state_id, template._c_score
+        self._c_is_game_over = template._c_is_game_over
+        self._scores = [0.0] * n_envs
+
+        self.n_threads = max(1, min(n_threads or os.cpu_count() or 1, n_envs))
+        bounds = np.linspace(0, n_envs, self.n_threads + 1).astype(int)
+        self._chunks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self._executor = ThreadPoolExecutor(self.n_threads) if self.n_threads > 1 else None
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        reset, score, state_id = self._c_reset, self._c_score, self._c_state_id
+        for i, handle in enumerate(self._handles):
+            reset(handle)
+            self._scores[i] = score(handle)
+            self.states[i] = state_id(handle)
+        self.dones[:] = False
+        return self.states.copy()
+
+    def _step_chunk(self, lo: int, hi: int, actions: List[int], rewards: np.ndarray):
+        """Steps instances lo..hi-1; each thread only touches its own slice of the state"""
+        step, score, state_id = self._c_step, self._c_score, self._c_state_id
+        is_game_over, reset = self._c_is_game_over, self._c_reset
+        handles, scores = self._handles, self._scores
+        states, chunk_rewards, dones = [], [], []
+        for i in range(lo, hi):
+            handle = handles[i]
+            step(handle, actions[i])
+            new_score = score(handle)
+            chunk_rewards.append(new_score - scores[i])
+            done = is_game_over(handle)
+            if done:
+                reset(handle)
+                new_score = score(handle)
+            scores[i] = new_score
+            states.append(state_id(handle))
+            dones.append(done)
+        self.states[lo:hi] = states
+        self.dones[lo:hi] = dones
+        rewards[lo:hi] = chunk_rewards
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Steps every instance; returns (states, rewards, dones), auto-resetting finished instances"""
+        actions = np.asarray(actions)
+        if ((actions < 0) | (actions >= self.n_actions)).any():
+            raise ValueError(f"Invalid action in {actions}")
+        actions = actions.tolist()
+        rewards = np.empty(self.n_envs, dtype=np.float64)
+
+        if self._executor is None:
+            self._step_chunk(0, self.n_envs, actions, rewards)
+        else:
+            futures = [self._executor.submit(self._step_chunk, lo, hi, actions, rewards)
+                       for lo, hi in self._chunks]
+            for future in futures:
+                future.result()
+        return self.states.copy(), rewards, self.dones.copy()
+
+    def close(self):
+        """Stops the stepping threads"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def benchmark_step(env_id: int, n_steps: int = 100000, seed: int = 0, repeats: int = 5) -> Dict[str, float]:
+    """
+    Steps per second of SecretEnvWrapper.step ('fused') against the original path ('legacy':
+    five calls through self.env.wrapper.lib), on the same actions.
+    The two paths alternate over `repeats` runs and the best run of each is kept.
+    """
+    env = SecretEnvWrapper(env_id)
+    native = env.env
+
+    def legacy_step(action):
+        prev_score = native.score()
+        native.step(action)
+        new_state = native.state_id()
+        reward = native.score() - prev_score
+        done = native.is_game_over()
+        return new_state, reward, done, {}
+
+    actions = np.random.default_rng(seed).integers(env.n_actions, size=n_steps).tolist()
+    results = {'legacy': 0.0, 'fused': 0.0}
+    for _ in range(repeats):
+        for name, step in (('legacy', legacy_step), ('fused', env.step)):
+            env.reset()
+            start = time.perf_counter()
+            for action in actions:
+                if step(action)[2]:
+                    env.reset()
+            results[name] = max(results[name], n_steps / (time.perf_counter() - start))
+    results['speedup'] = results['fused'] / results['legacy']
+    return results
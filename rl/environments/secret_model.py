@@ -0,0 +1,127 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+from typing import Tuple
+from .secret import secret_envs_wrapper
+from .tabular_model import TabularModel, build_tabular_model
+
+DEFAULT_CACHE_DIR = "saved_models/secret_models"
+
+
+def library_hash(path: str = None) -> str:
+    """Returns a short SHA-256 digest of the secret environments' shared library"""
+    path = secret_envs_wrapper.library_path(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _cache_paths(env_id: int, cache_dir: str, lib_path: str) -> Tuple[str, str]:
+    prefix = os.path.join(cache_dir, f"secret_env_{env_id}_{library_hash(lib_path)}")
+    return prefix + "_p.npy", prefix + "_rewards.npy"
+
+
+def extract_mdp_tensors(secret_env, p_path: str, rewards_path: str):
+    """
+    Pulls the full p[s, a, s', r] tensor and reward vector out of a secret environment
+    (one native call per entry) and writes them to .npy files.
+    """
+    n_states = secret_env.num_states()
+    n_actions = secret_env.num_actions()
+    n_rewards = secret_env.num_rewards()
+    rewards = np.array([secret_env.reward(i) for i in range(n_rewards)], dtype=np.float32)
+
+    # Write to temporary files first so an interrupted extraction never leaves a valid-looking cache.
+    # Names are unique per call: processes extracting the same env must not share a memmap.
+    tmp_dir = os.path.dirname(p_path) or "."
+    p_fd, p_tmp = tempfile.mkstemp(suffix=".npy", dir=tmp_dir)
+    r_fd, rewards_tmp = tempfile.mkstemp(suffix=".npy", dir=tmp_dir)
+    os.close(p_fd)
+    os.close(r_fd)
+    try:
+        p = np.lib.format.open_memmap(p_tmp, mode='w+', dtype=np.float32,
+                                      shape=(n_states, n_actions, n_states, n_rewards))
+        prob = secret_env.p
+        for s in range(n_states):
+            for a in range(n_actions):
+                for s_p in range(n_states):
+                    for r in range(n_rewards):
+                        p[s, a, s_p, r] = prob(s, a, s_p, r)
+        p.flush()
+        del p
+        np.save(rewards_tmp, rewards)
+
+        # The rewards land first: a cache is complete once p_path exists
+        os.replace(rewards_tmp, rewards_path)
+        os.replace(p_tmp, p_path)
+    finally:
+        for path in (p_tmp, rewards_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def load_mdp_tensors(secret_env, env_id: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                     lib_path: str = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the (p, rewards) tensors of a secret environment as memory-mapped arrays.
+    They are extracted once and cached on disk, keyed by a hash of the library file.
+    """
+    # Hash the library the environment was actually loaded from, not whatever lib_path is now
+    p_path, rewards_path = _cache_paths(env_id, cache_dir, lib_path or secret_env.wrapper.path)
+    if not (os.path.exists(p_path) and os.path.exists(rewards_path)):
+        os.makedirs(cache_dir, exist_ok=True)
+        extract_mdp_tensors(secret_env, p_path, rewards_path)
+    return np.load(p_path, mmap_mode='r'), np.load(rewards_path, mmap_mode='r')
+
+
+def model_from_tensors(p: np.ndarray, rewards: np.ndarray, sparse: bool = None) -> TabularModel:
+    """
+    Builds a TabularModel from p[s, a, s', r] and the reward vector.
+    States with no outgoing probability mass are terminal; in the other states,
+    actions with no probability mass are treated as unavailable.
+    """
+    n_states, n_actions = p.shape[0], p.shape[1]
+    rewards = np.asarray(rewards, dtype=np.float64)
+    rows, cols, probs, outcome_rewards = [], [], [], []
+    R = np.zeros((n_states, n_actions))
+    # One state at a time, to keep memory-mapped reads bounded
+    for s in range(n_states):
+        p_s = np.asarray(p[s], dtype=np.float64)
+        R[s] = p_s.sum(axis=1) @ rewards
+        # One entry per (a, s', r) outcome, so simulators can sample the reward too
+        actions, next_states, reward_ids = np.nonzero(p_s)
+        rows.append(s * n_actions + actions)
+        cols.append(next_states)
+        probs.append(p_s[actions, next_states, reward_ids])
+        outcome_rewards.append(rewards[reward_ids])
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    probs = np.concatenate(probs) if probs else np.zeros(0)
+    outcome_rewards = np.concatenate(outcome_rewards) if outcome_rewards else np.zeros(0)
+
+    action_mask = np.zeros((n_states, n_actions), dtype=bool)
+    action_mask.reshape(-1)[rows] = True
+    terminal = ~action_mask.any(axis=1)
+
+    # Terminal states are absorbing with zero reward, like in compiled models
+    terminal_states = np.flatnonzero(terminal)
+    action_mask[terminal] = True
+    R[terminal] = 0.0
+    rows = np.concatenate([rows, (terminal_states[:, None] * n_actions + np.arange(n_actions)).ravel()])
+    cols = np.concatenate([cols, np.repeat(terminal_states, n_actions)])
+    probs = np.concatenate([probs, np.ones(len(terminal_states) * n_actions)])
+    outcome_rewards = np.concatenate([outcome_rewards, np.zeros(len(terminal_states) * n_actions)])
+
+    return build_tabular_model(range(n_states), range(n_actions), rows, cols, probs,
+                               R, terminal, action_mask, sparse, outcome_rewards)
+
+
+def load_secret_model(secret_env, env_id: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                      lib_path: str = None, sparse: bool = None) -> TabularModel:
+    """Returns the compiled TabularModel of a secret environment, using the on-disk tensor cache"""
+    p, rewards = load_mdp_tensors(secret_env, env_id, cache_dir, lib_path)
+    return model_from_tensors(p, rewards, sparse)
@@ -0,0 +1,318 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Compiled models, keyed by (BaseEnvironment.config_key(), sparse)
+_MODEL_CACHE = {}
+
+# Above this many P[s, a, s'] entries, compile_model builds a sparse model by default
+DENSE_MAX_ENTRIES = 10 ** 7
+
+
+class CSRMatrix:
+    """
+    Minimal compressed sparse row matrix: row i holds the values data[indptr[i]:indptr[i + 1]]
+    at the columns indices[indptr[i]:indptr[i + 1]]. Supports products with vectors.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+        # Row id of every stored entry, for bincount-based products
+        self.row_ids = np.repeat(np.arange(shape[0]), np.diff(indptr))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes + self.row_ids.nbytes
+
+    def __matmul__(self, x: np.ndarray) -> np.ndarray:
+        products = self.data * x[self.indices]
+        return np.bincount(self.row_ids, weights=products, minlength=self.shape[0])
+
+    def dot_row(self, i: int, x: np.ndarray) -> float:
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.data[start:end] @ x[self.indices[start:end]]
+
+    def zero_rows(self, row_mask: np.ndarray):
+        """Sets every stored entry of the rows where row_mask is True to 0, in place"""
+        self.data[row_mask[self.row_ids]] = 0.0
+
+    def select_rows(self, rows: np.ndarray) -> 'CSRMatrix':
+        """Returns the matrix made of the given rows, in order"""
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # Position of every selected entry in the original arrays
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return CSRMatrix(indptr, self.indices[positions], self.data[positions].copy(),
+                         (len(rows), self.shape[1]))
+
+    def toarray(self) -> np.ndarray:
+        dense = np.zeros(self.shape)
+        dense[self.row_ids, self.indices] = self.data
+        return dense
+
+
+class TabularModel:
+    """
+    Compiled model of a finite MDP, stored as NumPy arrays.
+    - P[s, a, s']: transition probabilities
+    - R[s, a]: expected immediate reward
+    - terminal[s]: True for terminal states (absorbing, value 0)
+    - action_mask[s, a]: True if action a is available in state s
+    - outcomes (optional): CSRMatrix of shape [S * A, S'] with one stored entry per
+      (s, a, s', r) outcome, duplicates kept, and outcome_rewards[i] the reward of entry i.
+      Simulators sample rewards from them; R alone only gives their expectation.
+    States and actions are stored by index; `states` and `actions` map
+    the indices back to the environment's ids.
+    """
+
+    def __init__(self, states, actions, P, R, terminal, action_mask, outcomes=None, outcome_rewards=None):
+        self.states = list(states)
+        self.actions = list(actions)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.P = P
+        self.R = R
+        self.terminal = terminal
+        self.action_mask = action_mask
+        self.outcomes = outcomes
+        self.outcome_rewards = outcome_rewards
+        self.n_states = len(self.states)
+        self.n_actions = len(self.actions)
+        self._predecessors = None
+
+    @property
+    def nbytes(self) -> int:
+        total = self.P.nbytes + self.R.nbytes + self.terminal.nbytes + self.action_mask.nbytes
+        if self.outcomes is not None:
+            total += self.outcomes.nbytes + self.outcome_rewards.nbytes
+        return total
+
+    def q_values(self, V: np.ndarray, gamma: float) -> np.ndarray:
+        """Q[s, a] = R[s, a] + gamma * sum_s' P[s, a, s'] V[s'], -inf for unavailable actions"""
+        Q = self.R + gamma * (self.P @ V)
+        return np.where(self.action_mask, Q, -np.inf)
+
+    def q_row(self, s: int, V: np.ndarray, gamma: float) -> np.ndarray:
+        """Q values of the available actions of state index s"""
+        mask = self.action_mask[s]
+        return self.R[s, mask] + gamma * (self.P[s, mask] @ V)
+
+    def policy_model(self, pi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (P_pi, R_pi) for a policy given as action indices,
+        with terminal rows zeroed so terminal states keep a value of 0.
+        """
+        rows = np.arange(self.n_states)
+        P_pi = self.P[rows, pi]
+        R_pi = self.R[rows, pi]
+        P_pi[self.terminal] = 0.0
+        R_pi[self.terminal] = 0.0
+        return P_pi, R_pi
+
+    def predecessors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predecessor index in CSR form: indices[indptr[s']:indptr[s' + 1]] are the states
+        that reach s' with nonzero probability under some action. Built once, then cached.
+        """
+        if self._predecessors is None:
+            reachable = self.P.any(axis=1).T  # [s', s]
+            targets, sources = np.nonzero(reachable)
+            self._predecessors = _group_by_target(targets, sources, self.n_states)
+        return self._predecessors
+
+    def policy_to_indices(self, policy: Dict) -> np.ndarray:
+        """Converts a {state: action} policy into an array of action indices"""
+        return np.array([self.action_index[policy[s]] for s in self.states], dtype=np.int64)
+
+    def policy_from_indices(self, action_indices: np.ndarray) -> Dict:
+        """Converts an array of action indices into a {state: action} policy"""
+        return {s: self.actions[a] for s, a in zip(self.states, action_indices)}
+
+    def to_state_dict(self, values: np.ndarray) -> Dict:
+        """Converts a per-state array into a {state: value} dict"""
+        return {s: float(v) for s, v in zip(self.states, values)}
+
+
+class SparseTabularModel(TabularModel):
+    """
+    Compiled model with a sparse transition matrix, for large state spaces.
+    P is a CSRMatrix of shape [S * A, S'] where row s * A + a holds P[s, a, :].
+    Memory is proportional to the number of nonzero transitions.
+    """
+
+    def q_values(self, V: np.ndarray, gamma: float) -> np.ndarray:
+        Q = self.R + gamma * (self.P @ V).reshape(self.n_states, self.n_actions)
+        return np.where(self.action_mask, Q, -np.inf)
+
+    def q_row(self, s: int, V: np.ndarray, gamma: float) -> np.ndarray:
+        actions = np.flatnonzero(self.action_mask[s])
+        expected = [self.P.dot_row(s * self.n_actions + a, V) for a in actions]
+        return self.R[s, actions] + gamma * np.array(expected)
+
+    def policy_model(self, pi: np.ndarray) -> Tuple[CSRMatrix, np.ndarray]:
+        rows = np.arange(self.n_states)
+        P_pi = self.P.select_rows(rows * self.n_actions + pi)
+        R_pi = self.R[rows, pi]
+        P_pi.zero_rows(self.terminal)
+        R_pi[self.terminal] = 0.0
+        return P_pi, R_pi
+
+    def predecessors(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._predecessors is None:
+            sources = self.P.row_ids // self.n_actions
+            pairs = np.unique(self.P.indices * self.n_states + sources)
+            self._predecessors = _group_by_target(pairs // self.n_states, pairs % self.n_states,
+                                                  self.n_states)
+        return self._predecessors
+
+
+def _group_by_target(targets: np.ndarray, sources: np.ndarray, n_states: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Builds (indptr, sources) from (target, source) pairs sorted by target"""
+    indptr = np.zeros(n_states + 1, dtype=np.int64)
+    np.cumsum(np.bincount(targets, minlength=n_states), out=indptr[1:])
+    return indptr, sources
+
+
+def build_tabular_model(states, actions, rows, cols, probs, R, terminal, action_mask,
+                        sparse: bool = None, rewards=None) -> TabularModel:
+    """
+    Assembles a model from transition entries P[rows // A, rows % A, cols] += probs.
+    rewards, if given, holds the reward of every entry; the entries are then also kept
+    unmerged as the model's outcomes.
+    With sparse=None, a SparseTabularModel is built when the dense tensor would exceed
+    DENSE_MAX_ENTRIES entries.
+    """
+    n_states, n_actions = len(states), len(actions)
+    n_rows = n_states * n_actions
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    probs = np.asarray(probs, dtype=np.float64)
+    if sparse is None:
+        sparse = n_states * n_actions * n_states > DENSE_MAX_ENTRIES
+
+    outcomes = outcome_rewards = None
+    if rewards is not None:
+        order = np.argsort(rows, kind='stable')
+        outcome_indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=outcome_indptr[1:])
+        outcomes = CSRMatrix(outcome_indptr, cols[order], probs[order], (n_rows, n_states))
+        outcome_rewards = np.asarray(rewards, dtype=np.float64)[order]
+
+    if not sparse:
+        P = np.zeros((n_rows, n_states))
+        np.add.at(P, (rows, cols), probs)
+        P = P.reshape(n_states, n_actions, n_states)
+        return TabularModel(states, actions, P, R, terminal, action_mask, outcomes, outcome_rewards)
+
+    # Merge duplicate entries and sort them by (row, col)
+    keys, inverse = np.unique(rows * n_states + cols, return_inverse=True)
+    data = np.bincount(inverse, weights=probs, minlength=len(keys))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // n_states, minlength=n_rows), out=indptr[1:])
+    P = CSRMatrix(indptr, keys % n_states, data, (n_rows, n_states))
+    return SparseTabularModel(states, actions, P, R, terminal, action_mask, outcomes, outcome_rewards)
+
+
+def _is_terminal(env, state) -> bool:
+    return hasattr(env, 'is_terminal') and env.is_terminal(state)
+
+
+def _outcomes(env, state, action) -> List[Tuple[float, object, float]]:
+    """Returns the (prob, next_state, reward) outcomes of one state-action pair"""
+    # Exact enumeration (stochastic environments)
+    outcomes = env.transitions(state, action)
+    if outcomes is not None:
+        return outcomes
+
+    result = env.simulate_step(state, action)
+    if result is not None:
+        next_state, reward, _ = result
+        return [(1.0, next_state, reward)]
+
+    # Fall back on teleporting the live environment (single sample)
+    env.reset()
+    if hasattr(env, 'current_pos'):
+        env.current_pos = state
+    elif hasattr(env, 'state'):
+        env.state = state
+    else:
+        raise ValueError(f"Cannot compile a model of {type(env).__name__}: "
+                         f"it supports neither simulate_step nor teleporting")
+
+    next_state, reward, _, _ = env.step(action)
+    return [(1.0, next_state, reward)]
+
+
+def _build_model(env, sparse: bool = None) -> TabularModel:
+    # Environments that know their exact dynamics provide the model themselves
+    if hasattr(env, 'build_model'):
+        return env.build_model(sparse=sparse)
+
+    states = env.get_states()
+    state_actions = [env.get_actions(s) for s in states]
+    actions = sorted({a for acts in state_actions for a in acts})
+
+    state_index = {s: i for i, s in enumerate(states)}
+    action_index = {a: i for i, a in enumerate(actions)}
+    n_states, n_actions = len(states), len(actions)
+
+    rows, cols, probs, rewards = [], [], [], []
+    R = np.zeros((n_states, n_actions))
+    action_mask = np.zeros((n_states, n_actions), dtype=bool)
+    terminal = np.array([_is_terminal(env, s) for s in states], dtype=bool)
+
+    for i, state in enumerate(states):
+        for action in state_actions[i]:
+            j = action_index[action]
+            action_mask[i, j] = True
+            row = i * n_actions + j
+
+            # Terminal states are absorbing with zero reward
+            if terminal[i]:
+                rows.append(row)
+                cols.append(i)
+                probs.append(1.0)
+                rewards.append(0.0)
+                continue
+
+            for prob, next_state, reward in _outcomes(env, state, action):
+                if prob == 0:
+                    continue
+                rows.append(row)
+                cols.append(state_index[next_state])
+                probs.append(prob)
+                rewards.append(reward)
+                R[i, j] += prob * reward
+
+    env.reset()
+    return build_tabular_model(states, actions, rows, cols, probs, R, terminal, action_mask, sparse, rewards)
+
+
+def compile_model(env, use_cache: bool = True, sparse: bool = None) -> TabularModel:
+    """
+    Compiles an environment into a TabularModel by walking get_states()/get_actions() once.
+    sparse=True/False forces the representation; None picks it from the model size.
+    Models are cached per environment configuration (see BaseEnvironment.config_key).
+    """
+    config = env.config_key() if use_cache else None
+    key = None if config is None else (config, sparse)
+    if key is not None and key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
+
+    model = _build_model(env, sparse)
+    if key is not None:
+        _MODEL_CACHE[key] = model
+    return model
+
+
+def clear_model_cache():
+    """Drops every cached compiled model"""
+    _MODEL_CACHE.clear()
@@ -0,0 +1,166 @@
+import numpy as np
+from typing import List, Tuple
+from .base_env import BaseEnvironment
+from .tabular_model import SparseTabularModel, TabularModel, compile_model
+from .vector_env import VectorEnvironment
+
+class TabularSimulator(BaseEnvironment):
+    """
+    Environment that samples transitions from a compiled TabularModel instead of running step().
+    The model's outcomes are laid out row by row (one row per (s, a)) with their running
+    cumulative probability, so sampling an outcome is one searchsorted lookup, for one pair
+    or a whole batch. Each outcome carries its own reward, sampled with the next state;
+    models without per-outcome rewards give the expected reward R[s, a] instead.
+    start is a state id, or a probability vector over state indices for random starts.
+    """
+
+    def __init__(self, model: TabularModel, start=None, rng=None):
+        self.model = model
+        self.n_states = model.n_states
+        self.n_actions = model.n_actions
+        self.rng = rng if rng is not None else np.random.default_rng(np.random.randint(2 ** 31))
+        self._identity = model.states == list(range(model.n_states))
+        self._identity_actions = model.actions == list(range(model.n_actions))
+        self._build_tables()
+
+        if start is None:
+            start = model.states[0]
+        if np.ndim(start) == 0:
+            self.start_probs = None
+            self.start_index = model.state_index[start]
+        else:
+            self.start_probs = np.asarray(start, dtype=np.float64)
+            self.start_index = None
+        self.reset()
+
+    @classmethod
+    def from_env(cls, env, rng=None, sparse: bool = None) -> 'TabularSimulator':
+        """Compiles env (cached) and starts from the state its reset() returns"""
+        model = compile_model(env, sparse=sparse)
+        return cls(model, env.reset(), rng)
+
+    def _build_tables(self):
+        """Per-(s, a) row pointers into the outcomes, with cumulative probabilities and rewards"""
+        model = self.model
+        if model.outcomes is not None:
+            indptr, next_states, probs = model.outcomes.indptr, model.outcomes.indices, model.outcomes.data
+        elif isinstance(model, SparseTabularModel):
+            indptr, next_states, probs = model.P.indptr, model.P.indices, model.P.data
+        else:
+            flat = model.P.reshape(self.n_states * self.n_actions, self.n_states)
+            rows, next_states = np.nonzero(flat)
+            probs = flat[rows, next_states]
+            indptr = np.zeros(len(flat) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=len(flat)), out=indptr[1:])
+        self._indptr = indptr
+        self._next_states = next_states
+        if model.outcome_rewards is not None:
+            self._rewards = model.outcome_rewards
+        else:
+            self._rewards = np.repeat(model.R.reshape(-1), np.diff(indptr))
+        self._cumulative = np.cumsum(probs)
+        # Mass before each row, and each row's total (rows may not sum to exactly 1)
+        self._row_start = np.concatenate([[0.0], self._cumulative])[indptr[:-1]]
+        self._row_total = np.concatenate([[0.0], self._cumulative])[indptr[1:]] - self._row_start
+
+    def sample_outcomes(self, rows: np.ndarray, u: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(next-state indices, rewards) of the (s, a) rows s * n_actions + a, given uniforms u"""
+        targets = self._row_start[rows] + u * self._row_total[rows]
+        entries = np.searchsorted(self._cumulative, targets, side='right')
+        entries = np.clip(entries, self._indptr[rows], self._indptr[rows + 1] - 1)
+        return self._next_states[entries], self._rewards[entries]
+
+    def step_indices(self, states: np.ndarray, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Batched transition of state/action index arrays: (next_states, rewards, dones)"""
+        if not self.model.action_mask[states, actions].all():
+            raise ValueError("Unavailable action in batch")
+        rows = states * self.n_actions + actions
+        next_states, rewards = self.sample_outcomes(rows, self.rng.random(len(rows)))
+        return next_states, rewards, self.model.terminal[next_states]
+
+    def sample_start(self, n: int = None):
+        if self.start_probs is None:
+            return self.start_index if n is None else np.full(n, self.start_index, dtype=np.int64)
+        return self.rng.choice(self.n_states, size=n, p=self.start_probs)
+
+    def _to_id(self, s: int):
+        return s if self._identity else self.model.states[s]
+
+    def reset(self) -> int:
+        self.current = int(self.sample_start())
+        self.done = bool(self.model.terminal[self.current])
+        return self._to_id(self.current)
+
+    def step(self, action) -> Tuple[int, float, bool, dict]:
+        if self.done:
+            return self._to_id(self.current), 0.0, True, {}
+        a = self.model.action_index[action]
+        next_states, rewards, dones = self.step_indices(np.array([self.current]), np.array([a]))
+        self.current = int(next_states[0])
+        self.done = bool(dones[0])
+        return self._to_id(self.current), float(rewards[0]), self.done, {}
+
+    def get_actions(self, state=None) -> List:
+        if state is None:
+            return list(self.model.actions)
+        mask = self.model.action_mask[self.model.state_index[state]]
+        return [a for a, available in zip(self.model.actions, mask) if available]
+
+    def get_states(self) -> List:
+        return list(self.model.states)
+
+    def is_terminal(self, state) -> bool:
+        return bool(self.model.terminal[self.model.state_index[state]])
+
+    def transitions(self, state, action) -> List[Tuple[float, object, float]]:
+        """The model's own outcomes, so compiling a simulator gives back its model"""
+        s, a = self.model.state_index[state], self.model.action_index[action]
+        row = s * self.n_actions + a
+        start, end = self._indptr[row], self._indptr[row + 1]
+        probs = np.diff(np.concatenate([[self._row_start[row]], self._cumulative[start:end]]))
+        return [(float(p), self._to_id(int(n)), float(r))
+                for p, n, r in zip(probs, self._next_states[start:end], self._rewards[start:end])]
+
+    def config_key(self):
+        return None
+
+    def env_spec(self):
+        start = self.model.states[self.start_index] if self.start_probs is None else self.start_probs
+        return type(self), {'model': self.model, 'start': start}
+
+    def render(self):
+        print(f"State: {self._to_id(self.current)} | Done: {self.done}")
+
+    def vectorize(self, n_envs: int) -> 'VectorTabularSimulator':
+        return VectorTabularSimulator(self, n_envs)
+
+
+class VectorTabularSimulator(VectorEnvironment):
+    """
+    N copies of a TabularSimulator stepped from an action array, with auto-reset.
+    States are model state indices, as the batched agents expect.
+    """
+
+    def __init__(self, simulator: TabularSimulator, n_envs: int):
+        super().__init__(simulator, n_envs)
+        self.simulator = simulator
+        self.states = simulator.sample_start(n_envs)
+
+    def reset(self) -> np.ndarray:
+        self.states = self.simulator.sample_start(self.n_envs)
+        self.dones[:] = False
+        return self.states.copy()
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        sim = self.simulator
+        if sim._identity_actions:
+            actions = np.asarray(actions)
+        else:
+            actions = np.array([sim.model.action_index[a] for a in actions], dtype=np.int64)
+        next_states, rewards, dones = sim.step_indices(self.states, actions)
+        next_states = next_states.copy()
+        if dones.any():
+            next_states[dones] = sim.sample_start(int(dones.sum()))
+        self.states = next_states
+        self.dones = dones
+        return next_states.copy(), rewards, dones
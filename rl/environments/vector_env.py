@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Optional, Tuple
+from .line_world import LineWorld
+from .grid_world import GridWorld
+
+class VectorEnvironment(ABC):
+    """
+    N copies of a tabular environment stepped together from an action array.
+    States and done flags live in NumPy arrays; copies that finish are reset on the same step,
+    so the returned states are the start state for those copies.
+    get_states/get_actions/is_terminal come from a single template environment,
+    so Q-tables are built with the same layout as for the scalar class.
+    """
+
+    def __init__(self, env, n_envs: int):
+        self.env = env
+        self.n_envs = n_envs
+        self.n_states = env.n_states
+        self.n_actions = env.n_actions
+        self.start_state = env.reset()
+        self.states = np.full(n_envs, self.start_state, dtype=np.int64)
+        self.dones = np.zeros(n_envs, dtype=bool)
+
+    def reset(self) -> np.ndarray:
+        self.states[:] = self.start_state
+        self.dones[:] = False
+        return self.states.copy()
+
+    @abstractmethod
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Steps every copy; returns (states, rewards, dones), auto-resetting finished copies"""
+        pass
+
+    def get_actions(self, state=None):
+        return self.env.get_actions(state)
+
+    def get_states(self):
+        return self.env.get_states()
+
+    def is_terminal(self, state) -> bool:
+        return self.env.is_terminal(state)
+
+    def config_key(self):
+        return self.env.config_key()
+
+
+class GoalVectorEnvironment(VectorEnvironment):
+    """
+    Vector environment with deterministic moves and a single goal state:
+    reaching it gives reward 1 and ends the episode. Subclasses define the moves in _move.
+    """
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        actions = np.asarray(actions)
+        if ((actions < 0) | (actions >= self.n_actions)).any():
+            raise ValueError(f"Invalid action in {actions}")
+
+        next_states = self._move(self.states, actions)
+        dones = next_states == self.goal_state
+        rewards = dones.astype(np.float64)
+
+        next_states[dones] = self.start_state
+        self.states = next_states
+        self.dones = dones
+        return next_states.copy(), rewards, dones
+
+    @abstractmethod
+    def _move(self, states: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        """Next state of each copy (before auto-reset)"""
+        pass
+
+
+class VectorLineWorld(GoalVectorEnvironment):
+    """N LineWorld copies, with the dynamics of LineWorld.step"""
+
+    def __init__(self, n_envs: int, length: int = 7, start_pos: int = 3, goal_pos: Optional[int] = None):
+        super().__init__(LineWorld(length, start_pos, goal_pos), n_envs)
+        self.length = length
+        self.goal_state = self.env.goal_pos
+
+    def _move(self, states, actions):
+        # 0: left, 1: right
+        return np.clip(states + 2 * actions - 1, 0, self.length - 1)
+
+
+class VectorGridWorld(GoalVectorEnvironment):
+    """N GridWorld copies, with the dynamics of GridWorld.step"""
+
+    # Row and column offsets of 0 (up), 1 (right), 2 (down), 3 (left)
+    D_ROW = np.array([-1, 0, 1, 0])
+    D_COL = np.array([0, 1, 0, -1])
+
+    def __init__(self, n_envs: int, size: int = 5):
+        super().__init__(GridWorld(size), n_envs)
+        self.size = size
+        self.goal_state = self.env._pos_to_state(self.env.goal_pos)
+
+    def _move(self, states, actions):
+        rows = np.clip(states // self.size + self.D_ROW[actions], 0, self.size - 1)
+        cols = np.clip(states % self.size + self.D_COL[actions], 0, self.size - 1)
+        return rows * self.size + cols
@@ -0,0 +1,120 @@
+import itertools
+import os
+import random
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List
+from .run_experiment import run_experiment
+
+def make_job(env_cls, agent_cls, episodes, name, env_kwargs=None, agent_kwargs=None,
+             seed=None, save_path=None) -> Dict:
+    """
+    One experiment, described by classes and kwargs so it can be shipped to a worker process:
+    the environment and agent are built inside the worker.
+    """
+    return {
+        'env_cls': env_cls, 'env_kwargs': env_kwargs or {},
+        'agent_cls': agent_cls, 'agent_kwargs': agent_kwargs or {},
+        'episodes': episodes, 'seed': seed, 'name': name, 'save_path': save_path,
+    }
+
+def expand_grid(envs, agents, param_grid=None, seeds=(None,), save_dir=None) -> List[Dict]:
+    """
+    Expands the (environment, agent, hyperparameters, seed) grid into jobs.
+    envs: (env_name, env_cls, env_kwargs) triples
+    agents: (agent_name, agent_cls, episodes) triples
+    param_grid: {agent_name: {param: [values]}}, the cartesian product of each agent's values
+    """
+    jobs = []
+    for (env_name, env_cls, env_kwargs), (agent_name, agent_cls, episodes) in itertools.product(envs, agents):
+        grid = (param_grid or {}).get(agent_name, {})
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            agent_kwargs = dict(zip(keys, values))
+            for seed in seeds:
+                tag = "".join(f"_{k}{v}" for k, v in agent_kwargs.items())
+                tag += "" if seed is None else f"_seed{seed}"
+                name = f"{agent_name}_{env_name}{tag}"
+                save_path = None if save_dir is None else os.path.join(save_dir, f"{name}.pkl")
+                jobs.append(make_job(env_cls, agent_cls, episodes, name, env_kwargs, agent_kwargs,
+                                     seed, save_path))
+    return jobs
+
+def run_job(job: Dict) -> Dict:
+    """Runs one job (in a worker); failures are reported in the result instead of raised"""
+    start = time.time()
+    result = {'name': job['name'], 'save_path': job['save_path'], 'policy': None, 'Q': None, 'error': None}
+    try:
+        if job['seed'] is not None:
+            np.random.seed(job['seed'])
+            random.seed(job['seed'])
+        env = job['env_cls'](**job['env_kwargs'])
+        agent = job['agent_cls'](env, **job['agent_kwargs'])
+        result['policy'], result['Q'] = run_experiment(agent, job['episodes'], name=job['name'],
+                                                       save_path=job['save_path'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['duration'] = time.time() - start
+    return result
+
+def _error_result(job: Dict, error: Exception) -> Dict:
+    return {'name': job['name'], 'save_path': job['save_path'], 'policy': None, 'Q': None,
+            'error': f"{type(error).__name__}: {error}", 'duration': 0.0}
+
+def run_parallel(jobs: List[Dict], n_workers: int = None) -> Iterator[Dict]:
+    """
+    Runs jobs on a process pool (one worker per CPU by default) and yields each result as it
+    completes. At most n_workers jobs are in flight, so when a worker dies (killed by the OS,
+    a native crash) the jobs that may have caused it are known: the pool is rebuilt and those
+    jobs are retried one at a time. A job that breaks the pool on its own is reported as an error;
+    the others, and the jobs not yet submitted, run as usual.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    queue = deque(jobs)
+    suspects = deque()  # Jobs in flight when a pool broke, retried alone
+    while queue or suspects:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            in_flight = {}
+            broken = False
+            while not broken and (queue or suspects or in_flight):
+                if suspects:
+                    if not in_flight:
+                        job = suspects.popleft()
+                        in_flight[pool.submit(run_job, job)] = (job, True)
+                else:
+                    while queue and len(in_flight) < n_workers:
+                        job = queue.popleft()
+                        in_flight[pool.submit(run_job, job)] = (job, False)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = any(isinstance(f.exception(), BrokenProcessPool) for f in done)
+                if broken:
+                    # Every other job in flight fails with the pool
+                    done, _ = wait(in_flight)
+                for future in done:
+                    job, isolated = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield future.result()
+                    elif isinstance(error, BrokenProcessPool) and not isolated:
+                        suspects.append(job)
+                    else:
+                        yield _error_result(job, error)
+
+def run_grid(jobs: List[Dict], n_workers: int = None) -> List[Dict]:
+    """Runs every job in parallel, printing results as they arrive and the wall time against the serial time"""
+    start = time.time()
+    results = []
+    for result in run_parallel(jobs, n_workers):
+        results.append(result)
+        status = f"Error: {result['error']}" if result['error'] else f"done in {result['duration']:.2f}s"
+        print(f"[{len(results)}/{len(jobs)}] {result['name']}: {status}")
+
+    wall = time.time() - start
+    # The serial baseline is the time the same jobs took summed one after another
+    serial = sum(r['duration'] for r in results)
+    print(f"Wall time {wall:.2f}s vs serial {serial:.2f}s ({serial / max(wall, 1e-9):.1f}x)")
+    return results
@@ -1,17 +1,82 @@
 import numpy as np
 
 class EpsilonGreedyPolicy:
-    def __init__(self, epsilon):
+    """
+    Epsilon-greedy selection with random tie-breaking among the best actions.
+    Uniform draws come from a pre-generated buffer on a np.random.Generator, so a step costs one
+    list read instead of a call into the global RNG. Without an explicit rng, the generator is
+    seeded from np.random on the first draw, which keeps runs reproducible under np.random.seed
+    while constructing a policy leaves the global stream untouched.
+    """
+
+    def __init__(self, epsilon, rng=None, buffer_size=4096, decay=1.0, min_epsilon=0.0):
         self.epsilon = epsilon
+        self.decay = decay
+        self.min_epsilon = min_epsilon
+        self._rng = rng
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._pos = 0
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = np.random.default_rng(np.random.randint(2 ** 31))
+        return self._rng
+
+    def seed(self, seed):
+        """Restarts the draws from a new generator (e.g. in a worker process)"""
+        self._rng = np.random.default_rng(seed)
+        self._buffer = []
+        self._pos = 0
+
+    def _uniform(self):
+        if self._pos == len(self._buffer):
+            self._buffer = self.rng.random(self.buffer_size).tolist()
+            self._pos = 0
+        u = self._buffer[self._pos]
+        self._pos += 1
+        return u
+
+    def select_action(self, q_values, actions, epsilon=None):
+        """Picks one of actions given their Q values; epsilon overrides self.epsilon for this call"""
+        eps = self.epsilon if epsilon is None else epsilon
+        if eps > 0 and self._uniform() < eps:
+            return actions[int(self._uniform() * len(actions))]
 
-    def select_action(self, q_values, actions):
-        if np.random.rand() < self.epsilon:
-            return np.random.choice(actions)
-        else:
-            # Handle multiple actions with same max value
-            max_q = np.max(q_values)
-            best_actions = [a for a, q in zip(actions, q_values) if q == max_q]
-            return np.random.choice(best_actions)
+        # Handle multiple actions with same max value
+        q_values = np.asarray(q_values)
+        best = np.flatnonzero(q_values == q_values.max())
+        if len(best) == 1:
+            return actions[best[0]]
+        return actions[best[int(self._uniform() * len(best))]]
+
+    def select_actions(self, q_matrix, mask=None, epsilon=None):
+        """
+        Batched selection for many states: returns the chosen column of each row of q_matrix.
+        mask[i, j] marks the actions available in row i; epsilon may be a scalar or one value per row.
+        """
+        q_matrix = np.asarray(q_matrix)
+        n_rows = len(q_matrix)
+        if mask is None:
+            mask = np.ones(q_matrix.shape, dtype=bool)
+        eps = self.epsilon if epsilon is None else epsilon
+
+        # Greedy columns, ties broken by the largest random key among the maxima
+        masked = np.where(mask, q_matrix, -np.inf)
+        ties = masked == masked.max(axis=1, keepdims=True)
+        chosen = np.where(ties, self.rng.random(q_matrix.shape), -1.0).argmax(axis=1)
+
+        explore = self.rng.random(n_rows) < eps
+        if explore.any():
+            keys = np.where(mask[explore], self.rng.random((int(explore.sum()), q_matrix.shape[1])), -1.0)
+            chosen[explore] = keys.argmax(axis=1)
+        return chosen
 
     def update_epsilon(self, new_epsilon):
         self.epsilon = new_epsilon
+
+    def decay_epsilon(self):
+        """Exponential schedule: epsilon <- max(min_epsilon, epsilon * decay)"""
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
+        return self.epsilon
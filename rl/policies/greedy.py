@@ -1,7 +1,7 @@
-import numpy as np
+from .epsilon_greedy import EpsilonGreedyPolicy
 
-class GreedyPolicy:
-    def select_action(self, q_values, actions):
-        max_q = np.max(q_values)
-        best_actions = [a for a, q in zip(actions, q_values) if q == max_q]
-        return np.random.choice(best_actions)
+class GreedyPolicy(EpsilonGreedyPolicy):
+    """Greedy selection with random tie-breaking (the epsilon = 0 case of EpsilonGreedyPolicy)"""
+
+    def __init__(self, rng=None, buffer_size=4096):
+        super().__init__(0.0, rng, buffer_size)
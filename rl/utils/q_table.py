@@ -0,0 +1,340 @@
+import numpy as np
+from typing import Dict, List
+
+# Above this many Q(s, a) entries, make_q_table builds a hash table by default
+DENSE_MAX_ENTRIES = 10 ** 7
+
+
+class QTable:
+    """
+    Dense Q-table backed by one contiguous [n_states, n_actions] array.
+    States and actions are mapped to row/column indices from get_states()/get_actions().
+    Only rows that have been written are exported (like the nested dicts it replaces),
+    and reads never insert entries. The greedy column of each row is kept up to date on
+    every write, so max/argmax and the greedy policy never rescan the table.
+    """
+
+    def __init__(self, states, actions, dtype=np.float64, action_mask=None):
+        self.states = list(states)
+        self.actions = list(actions)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.n_states = len(self.states)
+        self.n_actions = len(self.actions)
+        self.values = np.zeros((self.n_states, self.n_actions), dtype=dtype)
+        self.visited = np.zeros(self.n_states, dtype=bool)
+
+        if action_mask is None:
+            action_mask = np.ones((self.n_states, self.n_actions), dtype=bool)
+        self.action_mask = action_mask
+        # States ids equal to their row index skip the dict lookup
+        self._identity = self.states == list(range(self.n_states))
+        all_columns = np.arange(self.n_actions)
+        self._columns = [all_columns if mask.all() else np.flatnonzero(mask) for mask in action_mask]
+        # Greedy column per row (first one on ties); rows start at zero so it is the first available action
+        self.best = np.array([columns[0] if len(columns) else 0 for columns in self._columns], dtype=np.int64)
+
+    @classmethod
+    def from_env(cls, env, dtype=np.float64) -> 'QTable':
+        """Builds a zero table over the environment's states and (possibly state-dependent) actions"""
+        states = env.get_states()
+        state_actions = [env.get_actions(s) for s in states]
+        actions = sorted({a for acts in state_actions for a in acts})
+        action_index = {a: i for i, a in enumerate(actions)}
+
+        action_mask = np.zeros((len(states), len(actions)), dtype=bool)
+        for i, acts in enumerate(state_actions):
+            action_mask[i, [action_index[a] for a in acts]] = True
+        return cls(states, actions, dtype, action_mask)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.visited.nbytes + self.action_mask.nbytes + self.best.nbytes
+
+    def index(self, state) -> int:
+        return state if self._identity else self.state_index[state]
+
+    def columns(self, s: int) -> np.ndarray:
+        """Column indices of the actions available in row s"""
+        return self._columns[s]
+
+    def available_actions(self, s: int) -> List:
+        return [self.actions[a] for a in self._columns[s]]
+
+    def write(self, s: int, a: int, value):
+        """Sets Q[s, a] by row/column index and updates the greedy column of row s"""
+        values = self.values
+        old = values[s, a]
+        values[s, a] = value
+        self.visited[s] = True
+
+        b = self.best[s]
+        if a == b:
+            # Only a decrease of the greedy entry can move the argmax: rescan this row
+            if value < old:
+                columns = self._columns[s]
+                self.best[s] = columns[np.argmax(values[s, columns])]
+        elif value > values[s, b] or (value == values[s, b] and a < b):
+            self.best[s] = a
+
+    def add_at(self, rows: np.ndarray, cols: np.ndarray, deltas: np.ndarray):
+        """Batched Q[rows, cols] += deltas (repeated pairs accumulate), then refreshes the touched rows"""
+        np.add.at(self.values, (rows, cols), deltas)
+        rows = np.unique(rows)
+        self.visited[rows] = True
+        self.refresh(rows)
+
+    def move_towards(self, rows: np.ndarray, cols: np.ndarray, targets: np.ndarray, alpha):
+        """
+        Batched TD step Q[rows, cols] += alpha * (targets - Q[rows, cols]).
+        A pair repeated in the batch moves once towards the mean of its targets: one full step per
+        repeat would overshoot (and diverge) as soon as repeats * alpha > 2.
+        """
+        _, inverse, counts = np.unique(rows * self.n_actions + cols, return_inverse=True, return_counts=True)
+        self.add_at(rows, cols, alpha * (targets - self.values[rows, cols]) / counts[inverse])
+
+    def refresh(self, rows=slice(None)):
+        """Recomputes the greedy column of rows whose values were changed outside write()"""
+        self.best[rows] = np.where(self.action_mask[rows], self.values[rows], -np.inf).argmax(axis=1)
+
+    # Single-entry access (by state and action ids)
+    def get(self, state, action) -> float:
+        return self.values[self.index(state), self.action_index[action]]
+
+    def set(self, state, action, value):
+        self.write(self.index(state), self.action_index[action], value)
+
+    def add(self, state, action, delta):
+        s, a = self.index(state), self.action_index[action]
+        self.write(s, a, self.values[s, a] + delta)
+
+    def row(self, state) -> np.ndarray:
+        """Q values of the available actions of a state (a copy)"""
+        s = self.index(state)
+        return self.values[s, self._columns[s]]
+
+    def max(self, state) -> float:
+        """max_a Q(state, a) over the available actions"""
+        s = self.index(state)
+        return self.values[s, self.best[s]]
+
+    def argmax(self, state):
+        """Greedy action of a state (first one on ties)"""
+        return self.actions[self.best[self.index(state)]]
+
+    # Vectorized row operations (by row index)
+    def max_rows(self, rows=slice(None)) -> np.ndarray:
+        rows = np.arange(self.n_states)[rows]
+        return self.values[rows, self.best[rows]]
+
+    def argmax_rows(self, rows=slice(None)) -> np.ndarray:
+        """Column index of the greedy action of each row"""
+        return self.best[rows]
+
+    # Export
+    def greedy_policy(self) -> Dict:
+        """{state: greedy action} for every written state"""
+        rows = np.flatnonzero(self.visited)
+        best = self.argmax_rows(rows)
+        return {self.states[s]: self.actions[a] for s, a in zip(rows, best)}
+
+    def to_dict(self) -> Dict:
+        """{state: {action: value}} for every written state, like dict(Q) of the former nested defaultdicts"""
+        return {
+            self.states[s]: {self.actions[a]: float(self.values[s, a]) for a in self._columns[s]}
+            for s in np.flatnonzero(self.visited)
+        }
+
+
+class HashQTable:
+    """
+    Sparse Q-table with open addressing, for huge state spaces where few states are visited.
+    Integer state keys are hashed into a slot array (linear probing) that points at rows of
+    parallel keys / [capacity, n_actions] values arrays. Rows are appended in first-seen order
+    and never move, so row indices stay valid across resizes; the slot array doubles once the
+    load factor exceeds max_load. Exposes the same interface as QTable.
+    """
+
+    def __init__(self, actions, available=None, capacity: int = 1024, dtype=np.float64,
+                 max_load: float = 0.5):
+        self.actions = list(actions)
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.n_actions = len(self.actions)
+        # available(state) -> actions of a state; all actions when None
+        self.available = available
+        self.max_load = max_load
+        self.n_states = 0
+
+        n_slots = 1 << max(3, int(np.ceil(np.log2(capacity / max_load))))
+        self._slots = np.full(n_slots, -1, dtype=np.int64)
+        self._shift = 64 - (n_slots.bit_length() - 1)
+        self.keys = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, self.n_actions), dtype=dtype)
+        self.visited = np.zeros(capacity, dtype=bool)
+        self.action_mask = np.zeros((capacity, self.n_actions), dtype=bool)
+        self.best = np.zeros(capacity, dtype=np.int64)
+        self._columns = []
+        self._column_cache = {}
+
+    @classmethod
+    def from_env(cls, env, capacity: int = 1024, dtype=np.float64) -> 'HashQTable':
+        """Empty table over the environment's actions; a state's row is created on first write"""
+        return cls(env.get_actions(), env.get_actions, capacity, dtype)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return (self._slots.nbytes + self.keys.nbytes + self.values.nbytes
+                + self.visited.nbytes + self.action_mask.nbytes + self.best.nbytes)
+
+    @property
+    def states(self) -> np.ndarray:
+        return self.keys[:self.n_states]
+
+    def _hash(self, key: int) -> int:
+        # Fibonacci hashing: the top bits of key * 2^64 / phi
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self._shift
+
+    def find(self, state) -> int:
+        """Row of a state, or -1 if it has no row (never inserts)"""
+        key = int(state)
+        slots, keys = self._slots, self.keys
+        mask = len(slots) - 1
+        i = self._hash(key)
+        while True:
+            r = slots[i]
+            if r < 0:
+                return -1
+            if keys[r] == key:
+                return int(r)
+            i = (i + 1) & mask
+
+    def index(self, state) -> int:
+        """Row of a state, inserting a zero row if it is new"""
+        r = self.find(state)
+        return r if r >= 0 else self._insert(int(state))
+
+    def _insert(self, key: int) -> int:
+        if self.n_states + 1 > self.max_load * len(self._slots):
+            self._rehash(2 * len(self._slots))
+        if self.n_states == self.capacity:
+            self._grow_rows(2 * self.capacity)
+
+        r = self.n_states
+        self.n_states += 1
+        self.keys[r] = key
+        self._place(key, r)
+
+        columns = self._columns_of(key)
+        self.action_mask[r, columns] = True
+        self.best[r] = columns[0]
+        self._columns.append(columns)
+        return r
+
+    def _place(self, key: int, r: int):
+        mask = len(self._slots) - 1
+        i = self._hash(key)
+        while self._slots[i] >= 0:
+            i = (i + 1) & mask
+        self._slots[i] = r
+
+    def _rehash(self, n_slots: int):
+        self._slots = np.full(n_slots, -1, dtype=np.int64)
+        self._shift = 64 - (n_slots.bit_length() - 1)
+        for r in range(self.n_states):
+            self._place(int(self.keys[r]), r)
+
+    def _grow_rows(self, capacity: int):
+        extra = capacity - self.capacity
+        self.keys = np.concatenate([self.keys, np.zeros(extra, dtype=self.keys.dtype)])
+        self.values = np.concatenate([self.values, np.zeros((extra, self.n_actions), dtype=self.values.dtype)])
+        self.visited = np.concatenate([self.visited, np.zeros(extra, dtype=bool)])
+        self.action_mask = np.concatenate([self.action_mask, np.zeros((extra, self.n_actions), dtype=bool)])
+        self.best = np.concatenate([self.best, np.zeros(extra, dtype=np.int64)])
+
+    def _add_action(self, action):
+        """Appends a column for an action first seen in a state's action list"""
+        self.action_index[action] = self.n_actions
+        self.actions.append(action)
+        self.n_actions += 1
+        self.values = np.hstack([self.values, np.zeros((self.capacity, 1), dtype=self.values.dtype)])
+        self.action_mask = np.hstack([self.action_mask, np.zeros((self.capacity, 1), dtype=bool)])
+
+    def _columns_of(self, state) -> np.ndarray:
+        """Column indices of a state's available actions, shared between states with the same actions"""
+        acts = tuple(self.actions) if self.available is None else tuple(self.available(state))
+        columns = self._column_cache.get(acts)
+        if columns is None:
+            for a in acts:
+                if a not in self.action_index:
+                    self._add_action(a)
+            columns = np.array([self.action_index[a] for a in acts], dtype=np.int64)
+            self._column_cache[acts] = columns
+        return columns
+
+    def columns(self, s: int) -> np.ndarray:
+        return self._columns[s]
+
+    def available_actions(self, s: int) -> List:
+        return [self.actions[a] for a in self._columns[s]]
+
+    write = QTable.write
+    add_at = QTable.add_at
+    refresh = QTable.refresh
+
+    # Single-entry access (by state and action ids); unseen states read as zeros
+    def get(self, state, action) -> float:
+        r = self.find(state)
+        return 0.0 if r < 0 else self.values[r, self.action_index[action]]
+
+    set = QTable.set
+    add = QTable.add
+
+    def row(self, state) -> np.ndarray:
+        r = self.find(state)
+        if r < 0:
+            return np.zeros(len(self._columns_of(state)), dtype=self.values.dtype)
+        return self.values[r, self._columns[r]]
+
+    def max(self, state) -> float:
+        r = self.find(state)
+        return 0.0 if r < 0 else self.values[r, self.best[r]]
+
+    def argmax(self, state):
+        r = self.find(state)
+        return self.actions[self._columns_of(state)[0] if r < 0 else self.best[r]]
+
+    # Vectorized row operations (by row index)
+    def max_rows(self, rows=slice(None)) -> np.ndarray:
+        rows = np.arange(self.n_states)[rows]
+        return self.values[rows, self.best[rows]]
+
+    def argmax_rows(self, rows=slice(None)) -> np.ndarray:
+        return self.best[:self.n_states][rows]
+
+    # Export
+    def greedy_policy(self) -> Dict:
+        rows = np.flatnonzero(self.visited[:self.n_states])
+        best = self.argmax_rows(rows)
+        return {int(self.keys[s]): self.actions[a] for s, a in zip(rows, best)}
+
+    def to_dict(self) -> Dict:
+        return {
+            int(self.keys[s]): {self.actions[a]: float(self.values[s, a]) for a in self._columns[s]}
+            for s in np.flatnonzero(self.visited[:self.n_states])
+        }
+
+
+def make_q_table(env, sparse: bool = None, dtype=np.float64):
+    """
+    Q-table for an agent: a dense QTable, or a HashQTable with sparse=True.
+    With sparse=None, the hash table is used when a dense table would exceed DENSE_MAX_ENTRIES entries.
+    """
+    if sparse is None:
+        sparse = len(env.get_states()) * len(env.get_actions()) > DENSE_MAX_ENTRIES
+    if sparse:
+        return HashQTable.from_env(env, dtype=dtype)
+    return QTable.from_env(env, dtype)
@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Dict, Tuple
+
+
+class ReturnStats:
+    """
+    Running per-(s, a) return statistics for Monte Carlo agents: count, mean and optionally M2
+    (sum of squared deviations, Welford) in arrays shaped like a Q-table's values.
+    Updates are O(1) and memory is constant per pair; two instances merge exactly (Chan et al.).
+    Indexing is shared with the Q-table the statistics belong to.
+    """
+
+    def __init__(self, q_table, track_variance: bool = True):
+        self.q_table = q_table
+        shape = q_table.values.shape
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64) if track_variance else None
+
+    @classmethod
+    def from_arrays(cls, q_table, count: np.ndarray, mean: np.ndarray, m2: np.ndarray = None) -> 'ReturnStats':
+        """Wraps statistics computed elsewhere (e.g. returned by a worker process)"""
+        stats = cls(q_table, track_variance=m2 is not None)
+        stats.count, stats.mean, stats.m2 = count, mean, m2
+        return stats
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(count, mean, m2) for shipping between processes"""
+        return self.count, self.mean, self.m2
+
+    def update(self, state, action, G: float) -> float:
+        """Adds one return of (state, action) and returns the new mean"""
+        s = self.q_table.index(state)
+        a = self.q_table.action_index[action]
+        n = self.count[s, a] + 1
+        self.count[s, a] = n
+        delta = G - self.mean[s, a]
+        mean = self.mean[s, a] + delta / n
+        self.mean[s, a] = mean
+        if self.m2 is not None:
+            self.m2[s, a] += delta * (G - mean)
+        return mean
+
+    def merge(self, other: 'ReturnStats'):
+        """Folds in statistics gathered over the same table layout (e.g. by another worker)"""
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        safe_n = np.maximum(n, 1)
+        delta = other.mean - self.mean
+        if self.m2 is not None and other.m2 is not None:
+            self.m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / safe_n
+        else:
+            self.m2 = None
+        self.mean = self.mean + delta * n_b / safe_n
+        self.count = n
+
+    def variance(self) -> np.ndarray:
+        """Sample variance of the returns (0 below two samples)"""
+        if self.m2 is None:
+            raise ValueError("Variance is not tracked (track_variance=False)")
+        return np.where(self.count > 1, self.m2 / np.maximum(self.count - 1, 1), 0.0)
+
+    def half_width(self, z: float = 1.96) -> np.ndarray:
+        """Normal-approximation confidence half-width of each mean"""
+        return z * np.sqrt(self.variance() / np.maximum(self.count, 1))
+
+    def to_dict(self, z: float = 1.96) -> Dict:
+        """{state: {action: {'count', 'mean'[, 'var', 'ci']}}} for every pair with at least one return"""
+        table = self.q_table
+        var = None if self.m2 is None else self.variance()
+        ci = None if self.m2 is None else self.half_width(z)
+        stats = {}
+        for s, a in zip(*np.nonzero(self.count)):
+            entry = {'count': int(self.count[s, a]), 'mean': float(self.mean[s, a])}
+            if var is not None:
+                entry['var'] = float(var[s, a])
+                entry['ci'] = float(ci[s, a])
+            stats.setdefault(table.states[s], {})[table.actions[a]] = entry
+        return stats
@@ -0,0 +1,22 @@
+import os
+import shutil
+import subprocess
+import pytest
+
+STAND_IN_SOURCE = os.path.join(os.path.dirname(__file__), "secret_envs_stand_in.c")
+
+
+@pytest.fixture(scope="session")
+def stand_in_lib(tmp_path_factory):
+    """Compiles the stand-in secret-env library and points secret_envs_wrapper.lib_path at it"""
+    compiler = shutil.which(os.environ.get("CC", "cc"))
+    if compiler is None:
+        pytest.skip("no C compiler to build the stand-in secret-env library")
+    path = str(tmp_path_factory.mktemp("secret_envs") / "libsecret_envs.so")
+    subprocess.run([compiler, "-O2", "-shared", "-fPIC", "-o", path, STAND_IN_SOURCE], check=True)
+
+    from rl.environments.secret import secret_envs_wrapper
+    previous = secret_envs_wrapper.lib_path
+    secret_envs_wrapper.lib_path = path
+    yield path
+    secret_envs_wrapper.lib_path = previous
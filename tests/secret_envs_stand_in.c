@@ -0,0 +1,55 @@
+/*
+ * Stand-in for libsecret_envs with the same C API, for tests without the real library.
+ * Every env is a line of N states started in the middle: 0 = left, 1 = right, 2 = stay.
+ * Both ends are terminal; reaching the right end scores +1, the left end -1.
+ */
+#include <stdbool.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+typedef struct { size_t s; float score; } Env;
+static const float REWARDS[3] = {-1.0f, 0.0f, 1.0f};
+
+#define DEFINE_ENV(ID, N) \
+size_t secret_env_##ID##_num_states(void) { return N; } \
+size_t secret_env_##ID##_num_actions(void) { return 3; } \
+size_t secret_env_##ID##_num_rewards(void) { return 3; } \
+float secret_env_##ID##_reward(size_t i) { return REWARDS[i]; } \
+static bool terminal_##ID(size_t s) { return s == 0 || s == N - 1; } \
+static size_t next_##ID(size_t s, size_t a) { \
+    if (terminal_##ID(s)) return s; \
+    return a == 0 ? s - 1 : (a == 1 ? s + 1 : s); \
+} \
+float secret_env_##ID##_transition_probability(size_t s, size_t a, size_t s_p, size_t r) { \
+    if (terminal_##ID(s)) return 0.0f; \
+    size_t n = next_##ID(s, a); \
+    size_t r_index = n == 0 ? 0 : (n == N - 1 ? 2 : 1); \
+    return (n == s_p && r_index == r) ? 1.0f : 0.0f; \
+} \
+void *secret_env_##ID##_new(void) { Env *e = malloc(sizeof(Env)); e->s = N / 2; e->score = 0; return e; } \
+void secret_env_##ID##_reset(void *p) { Env *e = p; e->s = N / 2; e->score = 0; } \
+void secret_env_##ID##_display(void *p) { Env *e = p; printf("state %zu score %f\n", e->s, e->score); } \
+size_t secret_env_##ID##_state_id(void *p) { return ((Env *)p)->s; } \
+bool secret_env_##ID##_is_forbidden(void *p, size_t a) { (void)p; return a > 2; } \
+bool secret_env_##ID##_is_game_over(void *p) { return terminal_##ID(((Env *)p)->s); } \
+size_t *secret_env_##ID##_available_actions(void *p) { \
+    (void)p; size_t *a = malloc(3 * sizeof(size_t)); a[0] = 0; a[1] = 1; a[2] = 2; return a; \
+} \
+size_t secret_env_##ID##_available_actions_len(void *p) { (void)p; return 3; } \
+void secret_env_##ID##_available_actions_delete(size_t *a, size_t n) { (void)n; free(a); } \
+void secret_env_##ID##_step(void *p, size_t a) { \
+    Env *e = p; \
+    if (terminal_##ID(e->s)) return; \
+    e->s = next_##ID(e->s, a); \
+    if (e->s == 0) e->score -= 1; else if (e->s == N - 1) e->score += 1; \
+} \
+float secret_env_##ID##_score(void *p) { return ((Env *)p)->score; } \
+void secret_env_##ID##_delete(void *p) { free(p); } \
+void *secret_env_##ID##_from_random_state(void) { \
+    Env *e = malloc(sizeof(Env)); e->s = 1 + rand() % (N - 2); e->score = 0; return e; \
+}
+
+DEFINE_ENV(0, 5)
+DEFINE_ENV(1, 7)
+DEFINE_ENV(2, 9)
+DEFINE_ENV(3, 11)
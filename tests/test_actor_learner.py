@@ -0,0 +1,86 @@
+import pickle
+import threading
+import time
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from rl.algorithms.planning.dyna_q import DynaQ
+from rl.algorithms.temporal_difference.actor_learner import FIELDS, FINISHED, TransitionRing
+from rl.algorithms.temporal_difference.q_learning import QLearning
+from rl.algorithms.temporal_difference.sarsa import SARSA
+from rl.environments.secret_env import SecretEnvWrapper
+
+
+def make_batch(start, n):
+    steps = np.arange(start, start + n)
+    return {field: steps.astype(dtype) for field, dtype in FIELDS}
+
+
+@pytest.fixture
+def ring():
+    ring = TransitionRing(4)
+    yield ring
+    ring.close(unlink=True)
+
+
+def test_empty_ring_pops_nothing(ring):
+    assert ring.lag() == 0
+    batch = ring.pop()
+    assert set(batch) == {field for field, _ in FIELDS}
+    assert all(len(values) == 0 for values in batch.values())
+
+
+def test_pushes_wrap_around_in_order(ring):
+    ring.push(make_batch(0, 3))
+    np.testing.assert_array_equal(ring.pop()['s'], [0, 1, 2])
+    # Slots 3, 0 and 1
+    ring.push(make_batch(3, 3))
+    assert ring.lag() == 3
+    batch = ring.pop()
+    np.testing.assert_array_equal(batch['s'], [3, 4, 5])
+    np.testing.assert_array_equal(batch['r'], [3.0, 4.0, 5.0])
+    assert ring.lag() == 0
+
+
+def test_push_waits_while_full(ring):
+    ring.push(make_batch(0, 4))
+    pusher = threading.Thread(target=ring.push, args=(make_batch(4, 2),))
+    pusher.start()
+    time.sleep(0.05)
+    assert pusher.is_alive() and ring.lag() == 4
+
+    np.testing.assert_array_equal(ring.pop()['s'], [0, 1, 2, 3])
+    pusher.join(timeout=5)
+    assert not pusher.is_alive()
+    np.testing.assert_array_equal(ring.pop()['s'], [4, 5])
+
+
+def test_attached_copy_shares_the_ring_until_unlinked():
+    owner = TransitionRing(8)
+    actor = pickle.loads(pickle.dumps(owner))
+    actor.push(make_batch(0, 2))
+    actor.header[FINISHED] = 1
+    actor.close()
+
+    assert owner.header[FINISHED] == 1
+    np.testing.assert_array_equal(owner.pop()['s'], [0, 1])
+    name = owner.shm.name
+    owner.close(unlink=True)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+@pytest.mark.parametrize("make_agent", [
+    lambda env: QLearning(env, sparse=False),
+    lambda env: SARSA(env, sparse=False),
+    lambda env: DynaQ(env),
+], ids=["q_learning", "sarsa", "dyna_q"])
+def test_actor_learner_on_stand_in_secret_env(stand_in_lib, make_agent):
+    np.random.seed(0)
+    agent = make_agent(SecretEnvWrapper(0))
+    policy, _ = agent.train_actor_learner(episodes=300, n_actors=2, batch_size=16, seed=0)
+    # Stand-in env 0: states 0..4 from 2, +1 for reaching 4 (action 1 moves right)
+    assert policy[3] == 1
+    stats = agent.actor_learner_stats
+    assert stats['actors'] == 2 and stats['steps'] >= 300
+    assert np.isfinite(agent.Q.values).all()
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from rl.environments.vector_env import VectorGridWorld
+from rl.algorithms.temporal_difference.batched_q_learning import BatchedQLearning
+from rl.utils.q_table import QTable
+
+
+@pytest.mark.parametrize("n_envs, alpha", [(256, 0.1), (256, 0.5), (1024, 0.5)])
+def test_many_copies_stay_finite(n_envs, alpha):
+    # Many copies share few (s, a) pairs, so every batch repeats pairs well past 2 / alpha
+    np.random.seed(0)
+    agent = BatchedQLearning(VectorGridWorld(n_envs, size=3), alpha=alpha)
+    agent.train(episodes=2000)
+    assert np.isfinite(agent.Q.values).all()
+    assert agent.Q.values.max() <= 1.0 + 1e-9
+
+
+def test_move_towards_repeated_pair_steps_to_mean_target():
+    Q = QTable([0, 1], [0, 1])
+    rows, cols = np.array([0, 0, 0, 1]), np.array([1, 1, 1, 0])
+    Q.move_towards(rows, cols, np.array([1.0, 2.0, 3.0, 4.0]), alpha=0.5)
+    assert Q.values[0, 1] == pytest.approx(0.5 * 2.0)
+    assert Q.values[1, 0] == pytest.approx(0.5 * 4.0)
+
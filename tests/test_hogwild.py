@@ -0,0 +1,42 @@
+import os
+import numpy as np
+import pytest
+from rl.algorithms.temporal_difference.q_learning import QLearning
+from rl.environments.grid_world import GridWorld
+from rl.environments.line_world import LineWorld
+
+
+def shared_segments():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+class FailingEnv(LineWorld):
+    def __init__(self):
+        raise RuntimeError("cannot build")
+
+
+def test_hogwild_learns_line_world_and_frees_shared_memory():
+    before = shared_segments()
+    agent = QLearning(LineWorld(), alpha=0.5, gamma=0.9, epsilon=0.3, sparse=False)
+    policy, Q = agent.train_hogwild(episodes=300, n_workers=2, seed=0)
+    # From the start (3) on, every position heads right, towards the goal (6)
+    assert [policy[s] for s in (3, 4, 5)] == [1, 1, 1]
+    assert agent.hogwild_stats['workers'] == 2 and agent.hogwild_stats['steps'] > 0
+    assert np.isfinite(agent.Q.values).all()
+    assert shared_segments() <= before
+
+
+def test_hogwild_learns_grid_world():
+    agent = QLearning(GridWorld(3), alpha=0.5, gamma=0.9, epsilon=0.3, sparse=False)
+    policy, _ = agent.train_hogwild(episodes=400, n_workers=2, seed=0)
+    # The cell left of the goal moves right and the one above it moves down
+    assert policy[7] == 1 and policy[5] == 2
+
+
+def test_failed_workers_still_free_shared_memory(monkeypatch):
+    before = shared_segments()
+    agent = QLearning(LineWorld(), sparse=False)
+    monkeypatch.setattr(agent.env, "env_spec", lambda: (FailingEnv, {}))
+    with pytest.raises(RuntimeError, match="Hogwild workers"):
+        agent.train_hogwild(episodes=10, n_workers=2, seed=0)
+    assert shared_segments() <= before
@@ -0,0 +1,21 @@
+import numpy as np
+from rl.algorithms.temporal_difference.lockstep_td import LockstepTDTrainer
+from rl.environments.vector_env import VectorGridWorld
+
+
+def test_run_reproduces_alone_with_its_seed():
+    batch = LockstepTDTrainer(VectorGridWorld(3, size=3), epsilons=0.3, seeds=[11, 22, 33])
+    batch.train(episodes=20)
+    alone = LockstepTDTrainer(VectorGridWorld(1, size=3), epsilons=0.3, seeds=[22])
+    alone.train(episodes=20)
+    np.testing.assert_array_equal(batch.Q[1], alone.Q[0])
+
+
+def test_single_seed_gives_independent_runs():
+    trainer = LockstepTDTrainer(VectorGridWorld(2, size=3), epsilons=0.3, seeds=5)
+    trainer.train(episodes=20)
+    assert not np.array_equal(trainer.Q[0], trainer.Q[1])
+
+    wider = LockstepTDTrainer(VectorGridWorld(4, size=3), epsilons=0.3, seeds=5)
+    wider.train(episodes=20)
+    np.testing.assert_array_equal(trainer.Q, wider.Q[:2])
@@ -0,0 +1,60 @@
+import copy
+import pickle
+import numpy as np
+from rl.algorithms.monte_carlo import parallel_mc
+from rl.algorithms.monte_carlo.off_policy_mc import OffPolicyMC
+from rl.algorithms.monte_carlo.on_policy_mc import OnPolicyFirstVisitMC
+from rl.environments.secret_env import SecretEnvWrapper
+from rl.utils.return_stats import ReturnStats
+
+
+def test_on_policy_train_parallel_runs(stand_in_lib):
+    np.random.seed(0)
+    agent = OnPolicyFirstVisitMC(SecretEnvWrapper(0), epsilon=0.2)
+    policy, Q = agent.train_parallel(episodes=200, n_workers=2, batch_size=25)
+    # Stand-in env 0: states 0..4 from 2, +1 for reaching 4 (action 1 moves right)
+    assert policy[3] == 1
+    # Every episode has at least one first visit
+    assert agent.returns.count.sum() >= 200
+    assert all(np.isfinite(v) for values in Q.values() for v in values.values())
+
+
+def test_off_policy_train_parallel_runs(stand_in_lib):
+    np.random.seed(0)
+    agent = OffPolicyMC(SecretEnvWrapper(0), epsilon=0.3)
+    policy, _ = agent.train_parallel(episodes=200, n_workers=2, batch_size=25)
+    assert policy[3] == 1
+    assert agent.C.values.sum() > 0
+
+
+def test_merged_returns_match_serial_batches(stand_in_lib):
+    batch_size = 30
+    np.random.seed(0)
+    parallel = OnPolicyFirstVisitMC(SecretEnvWrapper(1), epsilon=0.2)
+    # One round of two batches, both started from the initial Q
+    parallel.train_parallel(episodes=2 * batch_size, n_workers=2, batch_size=batch_size)
+
+    serial = OnPolicyFirstVisitMC(SecretEnvWrapper(1), epsilon=0.2)
+    parallel_mc._init_worker(copy.copy(serial), serial.env.env_spec())
+    np.random.seed(0)
+    expected = ReturnStats(serial.Q)
+    for seed in np.random.randint(2 ** 31, size=2):
+        Q = serial.Q
+        arrays = parallel_mc._on_policy_batch(Q.values.copy(), Q.best.copy(), batch_size, int(seed))
+        expected.merge(ReturnStats.from_arrays(Q, *arrays))
+
+    np.testing.assert_array_equal(parallel.returns.count, expected.count)
+    np.testing.assert_allclose(parallel.returns.mean, expected.mean)
+
+
+def test_worker_builds_its_own_env(stand_in_lib):
+    agent = OnPolicyFirstVisitMC(SecretEnvWrapper(2))
+    # The live env holds ctypes handles: only the agent without it is shipped
+    shipped = copy.copy(agent)
+    shipped.env = None
+    pickle.dumps(shipped)
+
+    parallel_mc._init_worker(pickle.loads(pickle.dumps(shipped)), agent.env.env_spec())
+    worker_env = parallel_mc._worker_agent.env
+    assert isinstance(worker_env, SecretEnvWrapper) and worker_env is not agent.env
+    assert worker_env.env_id == 2 and worker_env.reset() == agent.env.reset()
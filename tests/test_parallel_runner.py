@@ -0,0 +1,24 @@
+import os
+from rl.algorithms.temporal_difference.q_learning import QLearning
+from rl.environments.line_world import LineWorld
+from rl.experiments.parallel_runner import make_job, run_parallel
+
+
+class WorkerKiller(LineWorld):
+    """Ends its worker process without raising, like a native crash or the OOM killer"""
+
+    def __init__(self):
+        os._exit(1)
+
+
+def test_killed_worker_only_fails_its_own_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # run_experiment writes logs/
+    jobs = [make_job(LineWorld, QLearning, 20, f"line_{i}", seed=i) for i in range(6)]
+    jobs.insert(2, make_job(WorkerKiller, QLearning, 20, "killer"))
+
+    results = {r['name']: r for r in run_parallel(jobs, n_workers=2)}
+    assert sorted(results) == sorted(job['name'] for job in jobs)
+    assert results['killer']['error'].startswith("BrokenProcessPool")
+    for i in range(6):
+        assert results[f"line_{i}"]['error'] is None
+        assert results[f"line_{i}"]['policy']
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from rl.algorithms.dynamic_programming.policy_iteration import PolicyIteration
+from rl.environments.grid_world import GridWorld
+from rl.environments.line_world import LineWorld
+
+
+@pytest.mark.parametrize("env_cls", [LineWorld, GridWorld])
+@pytest.mark.parametrize("evaluation", ["auto", "direct", "iterative"])
+def test_undiscounted_evaluation_does_not_fail(env_cls, evaluation):
+    # At gamma = 1, I - P_pi is singular: "auto" must not pick the dense solve, and an explicit
+    # "direct" falls back to iterative sweeps
+    np.random.seed(0)
+    agent = PolicyIteration(env_cls(), gamma=1.0, evaluation=evaluation)
+    policy, V = agent.train()
+    assert np.isfinite(list(V.values())).all()
+    assert max(V.values()) == pytest.approx(1.0)
+
+
+def test_auto_uses_direct_solve_only_when_discounted():
+    assert PolicyIteration(LineWorld(), gamma=0.9)._backend() == "direct"
+    assert PolicyIteration(LineWorld(), gamma=1.0)._backend() == "iterative"
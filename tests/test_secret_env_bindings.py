@@ -0,0 +1,167 @@
+import os
+import shutil
+import subprocess
+import sys
+import numpy as np
+import pytest
+from rl.environments.secret import secret_envs_wrapper
+from rl.environments.secret_env import SecretEnvWrapper, VectorSecretEnv
+from rl.environments.secret_model import library_hash, load_secret_model
+
+
+def _original_step(native, action):
+    """SecretEnvWrapper.step as it was before the fused binding path"""
+    prev_score = native.score()
+    native.step(action)
+    new_state = native.state_id()
+    reward = native.score() - prev_score
+    done = native.is_game_over()
+    return new_state, reward, done, {}
+
+
+@pytest.mark.parametrize("env_id", [0, 1, 2, 3])
+def test_fused_step_matches_original_path(stand_in_lib, env_id):
+    fused, original = SecretEnvWrapper(env_id), SecretEnvWrapper(env_id)
+    native = original.env
+    actions = np.random.default_rng(env_id).integers(fused.n_actions, size=2000).tolist()
+    for action in actions:
+        transition = fused.step(action)
+        assert transition == _original_step(native, action)
+        assert type(transition[3]) is dict
+        if transition[2]:
+            assert fused.reset() == original.reset()
+
+
+@pytest.mark.parametrize("env_id", [0, 1, 2, 3])
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_vector_env_matches_scalar_wrappers(stand_in_lib, env_id, n_threads):
+    n_envs = 16
+    vec_env = VectorSecretEnv(env_id, n_envs, n_threads=n_threads)
+    scalar_envs = [SecretEnvWrapper(env_id) for _ in range(n_envs)]
+    assert (vec_env.reset() == [env.reset() for env in scalar_envs]).all()
+
+    rng = np.random.default_rng(env_id)
+    n_done = 0
+    for _ in range(2000):
+        actions = rng.integers(vec_env.n_actions, size=n_envs)
+        states, rewards, dones = vec_env.step(actions)
+        for i, (env, action) in enumerate(zip(scalar_envs, actions.tolist())):
+            state, reward, done, _ = env.step(action)
+            if done:
+                # Auto-reset: the vector env returns the new start state
+                state = env.reset()
+            assert (states[i], rewards[i], dones[i]) == (state, reward, done)
+        n_done += int(dones.sum())
+    vec_env.close()
+    assert n_done > 0
+
+
+def test_pool_recycles_released_handles_from_reset_state(stand_in_lib):
+    env = secret_envs_wrapper.SecretEnv2.from_random_state()
+    handle = env.instance
+    env.step(1)
+    del env
+    recycled = secret_envs_wrapper.SecretEnv2()
+    assert recycled.instance == handle
+    assert recycled.state_id() == secret_envs_wrapper.SecretEnv2().state_id() == 4
+    assert recycled.score() == 0.0
+
+
+def test_env_takes_its_pool_from_the_wrapper_passed_in(stand_in_lib, tmp_path):
+    copy = str(tmp_path / "libsecret_envs_copy.so")
+    shutil.copy(stand_in_lib, copy)
+    secret_envs_wrapper.lib_path = copy
+    try:
+        wrapper = secret_envs_wrapper.SecretEnv1Wrapper()
+    finally:
+        secret_envs_wrapper.lib_path = stand_in_lib
+
+    env = secret_envs_wrapper.SecretEnv1(wrapper)
+    assert env.pool is secret_envs_wrapper.shared_pool(1, wrapper)
+    assert env.pool is not secret_envs_wrapper.shared_pool(1)
+    env.step(1)
+    assert env.state_id() == 4
+
+
+def test_closed_pool_deletes_idle_and_released_handles(stand_in_lib):
+    pool = secret_envs_wrapper.InstancePool(secret_envs_wrapper.shared_wrapper(0), 0)
+    handles = [pool.acquire() for _ in range(3)]
+    pool.release(handles[0])
+    pool.release(handles[1])
+    assert len(pool) == 2
+    pool.close()
+    assert len(pool) == 0
+    pool.release(handles[2])
+    assert len(pool) == 0
+
+
+def test_idle_handles_are_freed_at_exit(stand_in_lib):
+    script = f"""
+import atexit
+deleted = []
+# Registered first, so it runs after the module's own exit handler
+atexit.register(lambda: print(len(deleted)))
+from rl.environments.secret import secret_envs_wrapper
+secret_envs_wrapper.lib_path = {stand_in_lib!r}
+envs = [secret_envs_wrapper.SecretEnv0() for _ in range(5)]
+pool = envs[0].pool
+delete = pool._delete
+pool._delete = lambda instance: (deleted.append(instance), delete(instance))
+del envs
+assert len(pool) == 5
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "5"
+
+
+def test_lib_path_override_loads_the_new_library(stand_in_lib, tmp_path):
+    copy = str(tmp_path / "libsecret_envs_copy.so")
+    shutil.copy(stand_in_lib, copy)
+    first = secret_envs_wrapper.shared_wrapper(0)
+    secret_envs_wrapper.lib_path = copy
+    try:
+        assert secret_envs_wrapper.shared_wrapper(0).path == os.path.abspath(copy)
+        assert SecretEnvWrapper(0).env.wrapper.path == os.path.abspath(copy)
+    finally:
+        secret_envs_wrapper.lib_path = stand_in_lib
+    assert secret_envs_wrapper.shared_wrapper(0) is first
+
+
+def test_secret_model_matches_the_library_dynamics(stand_in_lib, tmp_path):
+    env = SecretEnvWrapper(1)
+    model = load_secret_model(env.env, 1, cache_dir=str(tmp_path), sparse=False)
+    # 7 states, both ends terminal; right from the middle moves one state right
+    assert model.terminal.tolist() == [True] + [False] * 5 + [True]
+    assert model.P[3, 1, 4] == 1.0 and model.R[3, 1] == 0.0
+    assert model.R[5, 1] == 1.0 and model.R[1, 0] == -1.0
+    assert any(library_hash(stand_in_lib) in name for name in os.listdir(tmp_path))
+
+
+def test_compiled_model_cache_is_keyed_on_the_library(stand_in_lib, tmp_path, monkeypatch):
+    from rl.environments.tabular_model import compile_model
+    # build_model caches tensors under the relative DEFAULT_CACHE_DIR
+    monkeypatch.chdir(tmp_path)
+    copy = str(tmp_path / "libsecret_envs_copy.so")
+    shutil.copy(stand_in_lib, copy)
+    first = SecretEnvWrapper(0)
+    secret_envs_wrapper.lib_path = copy
+    try:
+        second = SecretEnvWrapper(0)
+    finally:
+        secret_envs_wrapper.lib_path = stand_in_lib
+    assert first.config_key() != second.config_key()
+    assert compile_model(first) is compile_model(first)
+    assert compile_model(first) is not compile_model(second)
+
+
+def test_concurrent_extractions_do_not_share_temporary_files(stand_in_lib, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from rl.environments.secret_model import extract_mdp_tensors
+    p_path, rewards_path = str(tmp_path / "p.npy"), str(tmp_path / "rewards.npy")
+    envs = [SecretEnvWrapper(3).env for _ in range(4)]
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda env: extract_mdp_tensors(env, p_path, rewards_path), envs))
+    assert sorted(os.listdir(tmp_path)) == ["p.npy", "rewards.npy"]
+    p = np.load(p_path)
+    assert p.sum(axis=(2, 3))[1:-1].tolist() == [[1.0] * 3] * 9
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from rl.environments.tabular_model import build_tabular_model
+from rl.environments.tabular_simulator import TabularSimulator
+
+
+def coin_model(sparse):
+    # State 0, action 0: reaches the terminal state 1 with a reward of 0 or 2, each with probability 1/2
+    R = np.array([[1.0], [0.0]])
+    return build_tabular_model([0, 1], [0], rows=[0, 0, 1], cols=[1, 1, 1], probs=[0.5, 0.5, 1.0],
+                               R=R, terminal=np.array([False, True]),
+                               action_mask=np.ones((2, 1), dtype=bool), sparse=sparse, rewards=[0.0, 2.0, 0.0])
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_rewards_are_sampled_per_outcome(sparse):
+    sim = TabularSimulator(coin_model(sparse), start=0, rng=np.random.default_rng(0))
+    _, rewards, dones = sim.step_indices(np.zeros(4000, dtype=np.int64), np.zeros(4000, dtype=np.int64))
+    assert set(np.unique(rewards)) == {0.0, 2.0}
+    assert abs(rewards.mean() - 1.0) < 0.1
+    assert dones.all()
+    assert sorted(sim.transitions(0, 0)) == [(0.5, 1, 0.0), (0.5, 1, 2.0)]
+
+
+def test_models_without_outcomes_give_expected_rewards():
+    model = coin_model(False)
+    model.outcomes = model.outcome_rewards = None
+    sim = TabularSimulator(model, start=0, rng=np.random.default_rng(0))
+    _, rewards, _ = sim.step_indices(np.zeros(10, dtype=np.int64), np.zeros(10, dtype=np.int64))
+    assert (rewards == 1.0).all()
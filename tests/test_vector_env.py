@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from rl.environments.grid_world import GridWorld
+from rl.environments.vector_env import GoalVectorEnvironment, VectorEnvironment, VectorGridWorld
+
+
+def test_subclass_without_move_fails_at_construction():
+    class NoMove(GoalVectorEnvironment):
+        pass
+
+    with pytest.raises(TypeError):
+        NoMove(GridWorld(3), 4)
+
+
+def test_subclass_without_step_fails_at_construction():
+    class NoStep(VectorEnvironment):
+        pass
+
+    with pytest.raises(TypeError):
+        NoStep(GridWorld(3), 4)
+
+
+def test_grid_world_auto_resets_at_goal():
+    env = VectorGridWorld(2, size=2)
+    env.reset()
+    # 1: right, 2: down; the goal is the bottom-right cell
+    states, rewards, dones = env.step([1, 2])
+    states, rewards, dones = env.step([2, 1])
+    assert dones.all() and (rewards == 1.0).all()
+    assert (states == env.start_state).all()